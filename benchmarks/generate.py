@@ -0,0 +1,149 @@
+import json
+import random
+
+from pathlib import Path
+
+TEMPLATE = "Bench"
+
+# Keyword arguments for generate(), from a quick check up to a nightly run
+SIZES = {
+    "tiny": dict(documents=4, specs=2, pages=2, fragments=3, assets=1, asset_size=4096),
+    "small": dict(documents=100, specs=10, pages=5, fragments=20, assets=4, asset_size=1 << 18),
+    "medium": dict(documents=1000, specs=50, pages=10, fragments=50, assets=16, asset_size=1 << 20),
+    "large": dict(documents=5000, specs=200, pages=20, fragments=100, assets=32, asset_size=1 << 22),
+}
+
+WORDS = (
+    "static site generator page template fragment section header footer column "
+    "markdown docutils yaml metadata content build render cache output asset"
+).split()
+
+
+def sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def paragraph(rng, sentences=5):
+    return " ".join(sentence(rng) for _ in range(sentences))
+
+
+def front_matter(rng, index, kind):
+    return "---\ntitle: {} {}\ndate: 2021-{:02d}-{:02d}\ntype: {}\ntags: {}\n---\n".format(
+        kind.capitalize(),
+        index,
+        index % 12 + 1,
+        index % 28 + 1,
+        kind,
+        ", ".join(rng.sample(WORDS, 3)),
+    )
+
+
+def markdown_document(rng, index):
+    sections = []
+    for number in range(3):
+        sections.append("## Section {}\n\n{}\n\n- {}\n- {}\n".format(
+            number, paragraph(rng), sentence(rng, 4), sentence(rng, 4)
+        ))
+    return front_matter(rng, index, "post") + "\n".join(sections)
+
+
+def rst_document(rng, index):
+    sections = []
+    for number in range(3):
+        title = "Section {}".format(number)
+        sections.append("{}\n{}\n\n{}\n\n* {}\n* {}\n".format(
+            title, "=" * len(title), paragraph(rng), sentence(rng, 4), sentence(rng, 4)
+        ))
+    return front_matter(rng, index, "doc") + "\n".join(sections)
+
+
+def page_name(spec, page):
+    return "site_{}_page_{}".format(spec, page)
+
+
+def make_template(root, rng, specs, pages, fragments):
+    main = root / "web" / "bootstrap" / "main" / TEMPLATE
+    for folder in ["headers", "columns", "footer"]:
+        (main / "sections" / folder).mkdir(parents=True, exist_ok=True)
+    for spec in range(specs):
+        for page in range(pages):
+            (main / (page_name(spec, page) + ".html")).write_text("")
+    for number in range(fragments):
+        (main / "sections" / "headers" / "nav_{}.html".format(number)).write_text(
+            "<nav><a href=\"#\">{}</a></nav>\n".format(sentence(rng, 3))
+        )
+        (main / "sections" / "columns" / "column_{}.html".format(number)).write_text(
+            "<section><p>{}</p></section>\n".format(paragraph(rng, 20))
+        )
+        (main / "sections" / "footer" / "footer_{}.html".format(number)).write_text(
+            "<footer><p>{}</p></footer>\n".format(sentence(rng))
+        )
+    head = root / "web" / "bootstrap" / "head" / TEMPLATE
+    (head / "css").mkdir(parents=True, exist_ok=True)
+    (head / "js").mkdir(parents=True, exist_ok=True)
+    (head / "css" / "styles.css").write_text("body { margin: 0; }\n" * 200)
+    (head / "js" / "scripts.js").write_text("console.log('bench');\n" * 200)
+
+
+def fragment(rng, prefix, fragments, kind):
+    return {"file_name": "{}_{}".format(prefix, rng.randrange(fragments)), "type": kind}
+
+
+def make_spec(rng, index, pages, fragments):
+    # Pages draw from a small pool of fragments, so most of them are shared
+    spec = {"type": "website", "template": TEMPLATE, "pages": []}
+    for page in range(pages):
+        spec["pages"].append(
+            {
+                "name": page_name(index, page),
+                "framework": "bootstrap",
+                "css_file": "styles.css",
+                "js_file": "scripts.js",
+                "sections": [
+                    {
+                        "nav": fragment(rng, "nav", fragments, "navigation"),
+                        "div": [fragment(rng, "column", fragments, "body") for _ in range(4)]
+                        + [fragment(rng, "footer", fragments, "footer")],
+                    }
+                ],
+            }
+        )
+    return spec
+
+
+def generate(
+    root,
+    documents=100,
+    specs=10,
+    pages=5,
+    fragments=20,
+    assets=4,
+    asset_size=256 * 1024,
+    seed=0,
+):
+    # Half of the documents are Markdown and half reStructuredText, every spec
+    # is a Luday site whose pages share one pool of fragments
+    root = Path(root)
+    rng = random.Random(seed)
+    content = root / "content"
+    for folder in ["posts", "docs", "specs", "assets"]:
+        (content / folder).mkdir(parents=True, exist_ok=True)
+
+    for index in range(documents):
+        if index % 2 == 0:
+            path = content / "posts" / "post_{}.md".format(index)
+            path.write_text(markdown_document(rng, index))
+        else:
+            path = content / "docs" / "doc_{}.rst".format(index)
+            path.write_text(rst_document(rng, index))
+
+    make_template(root, rng, specs, pages, fragments)
+    for index in range(specs):
+        spec = make_spec(rng, index, pages, fragments)
+        path = content / "specs" / "site_{}.json".format(index)
+        path.write_text(json.dumps(spec, indent=1))
+
+    for index in range(assets):
+        path = content / "assets" / "blob_{}.png".format(index)
+        path.write_bytes(rng.getrandbits(8 * asset_size).to_bytes(asset_size, "little"))
+    return root
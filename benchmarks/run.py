@@ -0,0 +1,243 @@
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import statistics
+import subprocess
+import tempfile
+import contextlib
+
+from pathlib import Path
+
+import typer
+
+from benchmarks.generate import SIZES, generate
+from ssg.site import Site
+from ssg.content import Content
+from ssg.parsers import (
+    ResourceParser,
+    MarkdownParser,
+    ReStructuredTextParser,
+    LudayHtmlParser,
+)
+
+VERSION = 1
+
+
+def make_site(incremental=True):
+    parsers = [
+        ResourceParser(),
+        MarkdownParser(),
+        ReStructuredTextParser(),
+        LudayHtmlParser(),
+    ]
+    return Site("content", "dist", parsers, incremental=incremental, cache_dir=".ssg-cache")
+
+
+def clean(*paths):
+    for path in paths:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+# Every scenario does its own setup and returns the seconds spent in the part
+# being measured. They run from the root of the generated site.
+
+
+def cold_build():
+    clean("dist", ".ssg-cache")
+    return timed(make_site().build)
+
+
+def warm_build():
+    # Fresh output, but the front matter and render caches are warm
+    clean("dist")
+    return timed(make_site().build)
+
+
+def noop_build():
+    make_site().build()
+    return timed(make_site().build)
+
+
+def single_file_build():
+    make_site().build()
+    post = next(Path("content", "posts").glob("*.md"))
+    with open(post, "a") as file:
+        file.write("\nOne more line.\n")
+    return timed(make_site().build)
+
+
+def single_file_rebuild():
+    # The watch mode path, parsers and caches stay warm between edits
+    site = make_site()
+    site.build()
+    fragment = next(Path("web", "bootstrap", "main").rglob("column_0.html"))
+    with open(fragment, "a") as file:
+        file.write("<p>One more line.</p>\n")
+    return timed(site.rebuild, [fragment])
+
+
+def content_load():
+    documents = [
+        path.read_text()
+        for path in Path("content").rglob("*")
+        if path.suffix in (".md", ".rst")
+    ]
+    start = time.perf_counter()
+    for document in documents:
+        Content.load(document)
+    return time.perf_counter() - start
+
+
+def luday_parse():
+    # Set up like a build, so shared CSS and JS are copied once per run
+    parser = LudayHtmlParser()
+    parser.setup(make_site())
+    specs = sorted(Path("content", "specs").glob("*.json"))
+    dest = Path("dist-luday")
+    clean(dest)
+    start = time.perf_counter()
+    for spec in specs:
+        parser.reset()
+        parser.parse(spec, Path("content"), dest)
+    return time.perf_counter() - start
+
+
+SCENARIOS = {
+    "cold_build": cold_build,
+    "warm_build": warm_build,
+    "noop_build": noop_build,
+    "single_file_build": single_file_build,
+    "single_file_rebuild": single_file_rebuild,
+    "content_load": content_load,
+    "luday_parse": luday_parse,
+}
+
+
+def commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(root, repeat=3, scenarios=None, config=None):
+    results = {}
+    previous = os.getcwd()
+    os.chdir(root)
+    try:
+        for name in scenarios or SCENARIOS:
+            runs = []
+            for _ in range(repeat):
+                # Keep the build summary and any warnings out of the timings
+                with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(
+                    io.StringIO()
+                ):
+                    runs.append(SCENARIOS[name]())
+            results[name] = {
+                "min": min(runs),
+                "median": statistics.median(runs),
+                "runs": runs,
+            }
+    finally:
+        os.chdir(previous)
+    return {
+        "version": VERSION,
+        "commit": commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config or {},
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=0.1):
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None or before["median"] <= 0:
+            continue
+        ratio = result["median"] / before["median"]
+        if ratio > 1 + threshold:
+            regressions.append((name, before["median"], result["median"], ratio))
+    return regressions
+
+
+def report(data, baseline=None, stream=None):
+    stream = stream or sys.stdout
+    stream.write("{:<22} {:>11} {:>11} {:>9}\n".format("scenario", "median", "min", "change"))
+    for name, result in data["results"].items():
+        change = ""
+        if baseline is not None and name in baseline.get("results", {}):
+            before = baseline["results"][name]["median"]
+            if before > 0:
+                change = "{:+.1%}".format(result["median"] / before - 1)
+        stream.write(
+            "{:<22} {:>8.1f} ms {:>8.1f} ms {:>9}\n".format(
+                name, result["median"] * 1000, result["min"] * 1000, change
+            )
+        )
+
+
+def main(
+    size: str = "small",
+    repeat: int = 3,
+    output: str = "",
+    baseline: str = "",
+    threshold: float = 0.1,
+    workdir: str = "",
+    scenario: str = "",
+):
+    if size not in SIZES:
+        sys.stderr.write(
+            "\x1b[1;31mUnknown size {}, expected one of {}\n".format(size, ", ".join(SIZES))
+        )
+        raise typer.Exit(code=2)
+    scenarios = [name.strip() for name in scenario.split(",") if name.strip()] or None
+
+    with tempfile.TemporaryDirectory() as temporary:
+        root = Path(workdir or temporary)
+        generate(root, **SIZES[size])
+        data = run_suite(root, repeat, scenarios, dict(SIZES[size], size=size, repeat=repeat))
+
+    previous = None
+    if baseline:
+        with open(baseline, "r") as file:
+            previous = json.load(file)
+        if previous.get("config", {}).get("size") != size:
+            sys.stderr.write("\x1b[1;31mBaseline {} was not run with --size {}\n".format(baseline, size))
+            raise typer.Exit(code=2)
+    report(data, previous)
+    if output:
+        with open(output, "w") as file:
+            json.dump(data, file, indent=1)
+
+    if previous is not None:
+        regressions = compare(previous, data, threshold)
+        for name, before, after, ratio in regressions:
+            sys.stderr.write(
+                "\x1b[1;31m{} regressed from {:.1f} ms to {:.1f} ms ({:+.1%})\n".format(
+                    name, before * 1000, after * 1000, ratio - 1
+                )
+            )
+        if regressions:
+            raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
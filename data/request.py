@@ -1,24 +1,197 @@
-import markdownify
+import re
+import json
+import html
+import time
+import asyncio
+import hashlib
+import xml.etree.ElementTree as ElementTree
+
+import yaml
+import typer
 import requests
-import sys
+import markdownify
+
+from pathlib import Path
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+
+from ssg import log
+from ssg.output import replace
+
+TITLE = re.compile(r"<title[^>]*>(.*?)</title>", re.S | re.I)
+BODY = re.compile(r"<body[^>]*>(.*)</body>", re.S | re.I)
+SCRIPTS = re.compile(r"<(script|style|noscript)\b.*?</\1\s*>", re.S | re.I)
+
+
+class FetchCache:
+	# ETag and Last-Modified of every page fetched before, so unchanged pages
+	# come back as an empty 304 instead of being downloaded and converted again
+	filename = "fetch.json"
+
+	def __init__(self, directory=None):
+		self.path = Path(directory) / self.filename if directory else None
+		self.entries = {}
+
+	def load(self):
+		if self.path is None:
+			return
+		try:
+			with open(self.path, "r") as file:
+				self.entries = json.load(file)
+		except (OSError, ValueError):
+			self.entries = {}
+
+	def save(self):
+		if self.path is None:
+			return
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		replace(self.path, json.dumps(self.entries, indent=1, sort_keys=True))
+
+	def headers(self, url, path):
+		entry = self.entries.get(url)
+		# A page deleted locally has to be downloaded again
+		if entry is None or not path.exists():
+			return {}
+		headers = {}
+		if entry.get("etag"):
+			headers["If-None-Match"] = entry["etag"]
+		if entry.get("last_modified"):
+			headers["If-Modified-Since"] = entry["last_modified"]
+		return headers
+
+	def update(self, url, response, path, digest):
+		self.entries[url] = {
+			"etag": response.headers.get("ETag"),
+			"last_modified": response.headers.get("Last-Modified"),
+			"path": path.as_posix(),
+			"hash": digest,
+		}
+
 
-# from ssg.parsers import Parser
+def makeSession(concurrency):
+	# One pooled keep-alive connection per worker and host
+	session = requests.Session()
+	adapter = requests.adapters.HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+	session.mount("http://", adapter)
+	session.mount("https://", adapter)
+	return session
 
-def getHtml():
-	url = 'https://afjfarms.com/home'
 
-	get_request = requests.get(url)
-	get_source_code = get_request.text
-	full_path = "content/afj-index.html"
-	# Parser.write(path='index', dest='content', content=get_source_code)
-	with open(full_path, "w") as file:
-		file.write(get_source_code)
-		output = sys.stdout.write("\x1b[1;32m{} converted to HTML. Metadata: {}\n")
-		return output
+def readUrls(source, session=None, timeout=30.0):
+	# A file or URL with one address per line, or a sitemap or sitemap index
+	if re.match(r"^https?://", source):
+		response = (session or requests).get(source, timeout=timeout)
+		response.raise_for_status()
+		text = response.text
+	else:
+		with open(source, "r", encoding="UTF-8") as file:
+			text = file.read()
+
+	if re.search(r"<(urlset|sitemapindex)\b", text):
+		root = ElementTree.fromstring(text.encode("utf-8"))
+		locations = [element.text.strip() for element in root.iter() if element.tag.endswith("loc") and element.text]
+		if root.tag.endswith("sitemapindex"):
+			urls = []
+			for location in locations:
+				urls.extend(readUrls(location, session, timeout))
+			return urls
+		return locations
+	return [line.strip() for line in text.splitlines() if line.strip() and not line.strip().startswith("#")]
+
+
+def pagePath(url, dest):
+	path = re.sub(r"\.(html?|php|aspx?)$", "", urlparse(url).path.strip("/"))
+	parts = [re.sub(r"[^\w.-]+", "-", part) for part in path.split("/") if part not in ("", ".", "..")]
+	if not parts:
+		parts = ["index"]
+	query = urlparse(url).query
+	if query:
+		# Pages that only differ in their query string get files of their own
+		parts[-1] += "-" + hashlib.sha1(query.encode("utf-8")).hexdigest()[:8]
+	return Path(dest, *parts[:-1], parts[-1] + ".md")
+
 
 def htmlToMarkdown(html):
 	markdown = markdownify.markdownify(html, heading_style="ATX")
 	return markdown
 
+
+def toContent(url, source):
+	title = TITLE.search(source)
+	body = BODY.search(source)
+	metadata = {"title": html.unescape(title.group(1)).strip() if title else pagePath(url, "").stem, "source": url}
+	markdown = htmlToMarkdown(SCRIPTS.sub("", body.group(1) if body else source)).strip()
+	front_matter = yaml.safe_dump(metadata, sort_keys=False, allow_unicode=True)
+	return "---\n{}---\n{}\n".format(front_matter, markdown)
+
+
+def fetchPage(session, cache, url, dest, timeout=30.0):
+	path = pagePath(url, dest)
+	try:
+		response = session.get(url, headers=cache.headers(url, path), timeout=timeout, stream=True)
+		with response:
+			if response.status_code == 304:
+				return "unchanged"
+			response.raise_for_status()
+			source = response.text
+		content = toContent(url, source).encode("utf-8")
+	except (requests.RequestException, ValueError) as error:
+		log.error("Failed to fetch {url}: {error}", "fetch", url=url, error=error)
+		return "failed"
+	digest = hashlib.sha256(content).hexdigest()
+	try:
+		if cache.entries.get(url, {}).get("hash") != digest or not path.exists():
+			replace(path, content)
+	except OSError as error:
+		log.error("Failed to save {url} to {path}: {error}", "fetch", url=url, path=path.as_posix(), error=error)
+		return "failed"
+	cache.update(url, response, path, digest)
+	log.debug("{url} saved to {path}", "fetched", url=url, path=path.as_posix())
+	return "fetched"
+
+
+async def fetchAll(urls, dest="content", cache=None, concurrency=16, timeout=30.0):
+	# Requests run on a thread per connection, the event loop only schedules them
+	cache = cache or FetchCache()
+	session = makeSession(concurrency)
+	loop = asyncio.get_running_loop()
+	counts = {"fetched": 0, "unchanged": 0, "failed": 0}
+	# /a, /a/ and /a.html are saved to the same file, only the first one is fetched
+	paths = {}
+	for url in urls:
+		path = pagePath(url, dest)
+		first = paths.setdefault(path, url)
+		if first != url:
+			log.warning("Skipped {url}, {first} is saved to {path} already", "duplicate", url=url, first=first, path=path.as_posix())
+	with session, ThreadPoolExecutor(max_workers=concurrency) as executor:
+		pending = [
+			loop.run_in_executor(executor, fetchPage, session, cache, url, dest, timeout)
+			for url in paths.values()
+		]
+		for result in asyncio.as_completed(pending):
+			status = await result
+			counts[status] += 1
+	return counts
+
+
+def main(urls: str, dest: str = "content", concurrency: int = 16, cache_dir: str = ".ssg-cache", timeout: float = 30.0):
+	start = time.perf_counter()
+	cache = FetchCache(Path(cache_dir) if cache_dir else None)
+	cache.load()
+	with makeSession(1) as session:
+		pages = readUrls(urls, session, timeout)
+	counts = asyncio.run(fetchAll(pages, dest, cache, concurrency, timeout))
+	cache.save()
+	log.info(
+		"Fetched {fetched} page(s), {unchanged} unchanged, {failed} failed in {seconds:.2f} s",
+		"summary",
+		seconds=time.perf_counter() - start,
+		**counts
+	)
+	log.current.close()
+	if counts["failed"]:
+		raise typer.Exit(code=1)
+
+
 if __name__ == '__main__':
-	getHtml()
+	typer.run(main)
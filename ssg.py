@@ -1,13 +1,77 @@
+import sys
+
+from ssg.startup import ImportTimer
+
+# Started before anything else is imported so the report covers the whole CLI
+timer = ImportTimer()
+if "--profile-startup" in sys.argv:
+    timer.install()
+
 import typer
-from ssg.site import Site
+from enum import Enum
+from ssg.site import Site, BuildError
+from ssg.assets import AssetPipeline
+from ssg.profile import Profiler
+from ssg.walk import IGNORE
+from ssg import log
 
 import ssg.parsers
 
+# Lets typer reject an unknown --link-mode with a usage error
+LinkMode = Enum("LinkMode", {mode: mode for mode in AssetPipeline.modes}, type=str)
+
+
+def main(
+    source="content",
+    dest="dist",
+    incremental: bool = False,
+    jobs: int = 1,
+    link_mode: LinkMode = LinkMode.copy,
+    cache_dir: str = ".ssg-cache",
+    profile_startup: bool = False,
+    watch: bool = False,
+    polling: bool = False,
+    serve: bool = False,
+    port: int = 8000,
+    profile: bool = False,
+    profile_output: str = "",
+    profile_top: int = 10,
+    atomic: bool = False,
+    ignore: str = "",
+    scan_threads: int = 1,
+    mirror_dirs: bool = False,
+    quiet: bool = False,
+    verbose: bool = False,
+    log_json: str = "",
+    progress: bool = True,
+    fingerprint: bool = False,
+    compress: bool = False,
+):
+    if profile_startup:
+        timer.uninstall()
+        timer.report()
+
+    # Quiet keeps warnings and errors, verbose adds a line per file
+    level = log.WARNING if quiet else log.DEBUG if verbose else log.INFO
+    log.activate(log.Logger(level, json_path=log_json or None, progress=progress))
 
-def main(source="content", dest="dist"):
     config = {
         "source": source,
         "dest": dest,
+        # Watch mode rebuilds against the manifest of the previous build
+        "incremental": incremental or watch,
+        "jobs": jobs,
+        "link_mode": link_mode.value,
+        "cache_dir": cache_dir,
+        "atomic": atomic,
+        # Extra comma separated patterns on top of .git, node_modules and *.swp
+        "ignore": IGNORE + [pattern for pattern in ignore.split(",") if pattern],
+        "scan_threads": scan_threads,
+        "mirror_dirs": mirror_dirs,
+        "fingerprint": fingerprint,
+        # Writes .gz, and .br with brotli installed, next to the text outputs
+        "compress": compress,
+        "profiler": Profiler() if profile or profile_output else None,
         "parsers": [
             # ssg.parsers.ResourceParser(),
             # ssg.parsers.MarkdownParser(),
@@ -15,6 +79,35 @@ def main(source="content", dest="dist"):
             ssg.parsers.LudayHtmlParser(),
         ],
     }
-    Site(**config).build()
+    if not watch and not serve:
+        try:
+            Site(**config).build()
+        except BuildError:
+            raise typer.Exit(code=1)
+        finally:
+            log.current.close()
+            if profile:
+                config["profiler"].report(profile_top)
+            if profile_output:
+                config["profiler"].export(profile_output)
+        return
+
+    site = Site(**config)
+    try:
+        if serve:
+            from ssg.serve import DevServer
+
+            DevServer(site, port=port, roots=["web"], polling=polling).run()
+            return
+
+        from ssg.watch import Watcher
+
+        try:
+            site.build()
+        except BuildError:
+            pass
+        Watcher(site, ["web"], polling=polling).run()
+    finally:
+        log.current.close()
 
 typer.run(main)
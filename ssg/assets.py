@@ -0,0 +1,89 @@
+import os
+import shutil
+
+from ssg.output import file_digest
+
+# ioctl request from linux/fs.h that clones the extents of one file into another
+FICLONE = 0x40049409
+
+
+class AssetPipeline:
+    modes = ["copy", "hardlink", "reflink"]
+
+    def __init__(self, mode="copy"):
+        if mode not in self.modes:
+            raise ValueError(
+                "Unknown link mode {}, expected one of {}".format(
+                    mode, ", ".join(self.modes)
+                )
+            )
+        self.mode = mode
+        self.reset()
+
+    def reset(self):
+        self.done = set()
+        self.copied = 0
+        self.linked = 0
+        self.skipped = 0
+
+    def matches(self, path, target):
+        try:
+            source = os.stat(path)
+            existing = os.stat(target)
+        except OSError:
+            return False
+        if os.path.samestat(source, existing):
+            return True
+        if source.st_size != existing.st_size:
+            return False
+        if source.st_mtime_ns == existing.st_mtime_ns:
+            return True
+        return file_digest(path) == file_digest(target)
+
+    def copy(self, path, target):
+        key = os.path.abspath(target)
+        if key in self.done or self.matches(path, target):
+            self.done.add(key)
+            self.skipped += 1
+            return
+
+        # Never write through an old hardlink into the source tree
+        # Another worker may be replacing the same shared asset
+        try:
+            os.unlink(target)
+        except FileNotFoundError:
+            pass
+
+        if self.mode == "hardlink" and self.hardlink(path, target):
+            self.linked += 1
+        elif self.mode == "reflink" and self.reflink(path, target):
+            self.linked += 1
+        else:
+            shutil.copy2(path, target)
+            self.copied += 1
+        self.done.add(key)
+
+    @staticmethod
+    def hardlink(path, target):
+        try:
+            os.link(path, target)
+        except OSError:
+            return False
+        return True
+
+    @staticmethod
+    def reflink(path, target):
+        try:
+            import fcntl
+        except ImportError:
+            return False
+
+        try:
+            with open(path, "rb") as source, open(target, "wb") as clone:
+                fcntl.ioctl(clone.fileno(), FICLONE, source.fileno())
+        except OSError:
+            if os.path.lexists(target):
+                os.unlink(target)
+            return False
+        shutil.copystat(path, target)
+        return True
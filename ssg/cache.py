@@ -0,0 +1,227 @@
+import os
+import pickle
+import hashlib
+import tempfile
+
+from pathlib import Path
+from collections import OrderedDict
+from ssg.profile import stage
+
+
+class FragmentCache:
+    def __init__(self, limit=32 * 1024 * 1024):
+        self.limit = limit
+        self.size = 0
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        # Workers start with an empty cache rather than a copy of ours
+        return {"limit": self.limit}
+
+    def __setstate__(self, state):
+        self.__init__(state["limit"])
+
+    def __len__(self):
+        return len(self.entries)
+
+    def read(self, path):
+        resolved = os.path.realpath(path)
+        stat = os.stat(resolved)
+        key = (resolved, stat.st_mtime_ns, stat.st_size)
+
+        text = self.entries.get(key)
+        if text is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return text
+
+        self.misses += 1
+        with stage("fragments"), open(resolved, "r", encoding="UTF-8") as file:
+            text = file.read()
+        self.store(key, text)
+        return text
+
+    def store(self, key, text):
+        # Drop any older version of the same file before caching the new one
+        for stale in [entry for entry in self.entries if entry[0] == key[0]]:
+            self.size -= len(self.entries.pop(stale))
+        if len(text) > self.limit:
+            return
+        self.entries[key] = text
+        self.size += len(text)
+        while self.size > self.limit:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+
+class DiskCache:
+    # Content-addressed pickles under directory/ab/abcdef..., safe to share
+    # between pool workers because every write is an atomic rename
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.memory = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        return {"directory": self.directory}
+
+    def __setstate__(self, state):
+        self.__init__(state["directory"])
+
+    @staticmethod
+    def key(*parts):
+        sha = hashlib.sha256()
+        for part in parts:
+            sha.update(part.encode("utf-8") if isinstance(part, str) else part)
+            sha.update(b"\0")
+        return sha.hexdigest()
+
+    def location(self, key):
+        return self.directory / key[:2] / key
+
+    def get(self, key):
+        data = self.recall(key)
+        if data is not None:
+            self.hits += 1
+            return pickle.loads(data)
+        try:
+            with open(self.location(key), "rb") as file:
+                data = file.read()
+            value = pickle.loads(data)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.remember(key, data)
+        return value
+
+    def put(self, key, value):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self.remember(key, data)
+        location = self.location(key)
+        try:
+            location.parent.mkdir(parents=True, exist_ok=True)
+            descriptor, temporary = tempfile.mkstemp(dir=location.parent)
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(data)
+            os.replace(temporary, location)
+        except OSError:
+            pass
+
+    def recall(self, key):
+        return self.memory.get(key)
+
+    def remember(self, key, data):
+        self.memory[key] = data
+
+    def forget(self, key):
+        self.memory.pop(key, None)
+
+
+class MetadataCache(DiskCache):
+    def load(self, fm, loader):
+        from yaml import load
+
+        key = self.key(loader.__name__, fm)
+        metadata = self.get(key)
+        if metadata is None:
+            metadata = load(fm, Loader=loader)
+            self.put(key, metadata)
+        return metadata
+
+
+class RenderCache(DiskCache):
+    # Disk usage is bounded by evicting the least recently used renders, and
+    # only the most recent ones up to memory_limit bytes stay in memory
+    def __init__(
+        self,
+        directory,
+        limit=256 * 1024 * 1024,
+        check_every=256,
+        memory_limit=32 * 1024 * 1024,
+    ):
+        super().__init__(directory)
+        self.limit = limit
+        self.check_every = check_every
+        self.memory_limit = memory_limit
+        self.memory = OrderedDict()
+        self.memory_size = 0
+        self.writes = 0
+
+    def __getstate__(self):
+        return {
+            "directory": self.directory,
+            "limit": self.limit,
+            "check_every": self.check_every,
+            "memory_limit": self.memory_limit,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(
+            state["directory"], state["limit"], state["check_every"], state["memory_limit"]
+        )
+
+    def recall(self, key):
+        data = self.memory.get(key)
+        if data is not None:
+            self.memory.move_to_end(key)
+        return data
+
+    def remember(self, key, data):
+        self.forget(key)
+        if len(data) > self.memory_limit:
+            return
+        self.memory[key] = data
+        self.memory_size += len(data)
+        while self.memory_size > self.memory_limit:
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_size -= len(evicted)
+
+    def forget(self, key):
+        data = self.memory.pop(key, None)
+        if data is not None:
+            self.memory_size -= len(data)
+
+    def get(self, key):
+        value = super().get(key)
+        if value is not None:
+            try:
+                os.utime(self.location(key))
+            except OSError:
+                pass
+        return value
+
+    def put(self, key, value):
+        super().put(key, value)
+        self.writes += 1
+        if self.writes % self.check_every == 0:
+            self.trim()
+
+    def trim(self):
+        files = []
+        total = 0
+        for path in self.directory.glob("*/*"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, path))
+            total += stat.st_size
+        files.sort()
+        for _, size, path in files:
+            if total <= self.limit:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            self.forget(path.name)
+            total -= size
+        return total
@@ -0,0 +1,149 @@
+import io
+import os
+import gzip
+import json
+import hashlib
+import posixpath
+
+from pathlib import Path
+from ssg.output import replace
+
+EXTENSIONS = [".html", ".htm", ".css", ".js", ".mjs", ".svg", ".json", ".xml", ".txt", ".map"]
+SUFFIXES = [".gz", ".br"]
+
+
+def available():
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return [".gz"]
+    return [".gz", ".br"]
+
+
+def encode(suffix, data):
+    if suffix == ".br":
+        import brotli
+
+        return brotli.compress(data, quality=11)
+    # A fixed mtime keeps the output identical across builds, gzip.compress
+    # only takes one from Python 3.8
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=9, mtime=0) as file:
+        file.write(data)
+    return buffer.getvalue()
+
+
+def compress_file(path, previous, suffixes, written):
+    with open(path, "rb") as file:
+        data = file.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if digest == previous and all(os.path.exists(path + suffix) for suffix in written):
+        return digest, written, False
+
+    stat = os.stat(path)
+    written = []
+    for suffix in SUFFIXES:
+        compressed = encode(suffix, data) if suffix in suffixes else None
+        # A sidecar that is not smaller would only be served in place of the original
+        if compressed is not None and len(compressed) < len(data):
+            replace(path + suffix, compressed)
+            os.utime(path + suffix, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            written.append(suffix)
+        elif os.path.lexists(path + suffix):
+            os.unlink(path + suffix)
+    return digest, written, True
+
+
+class Compressor:
+    # Writes name.gz, and name.br when brotli is installed, next to every text
+    # output so the server can send them as they are. Files are only compressed
+    # again when their content changed.
+    filename = "compress-manifest.json"
+    version = 1
+
+    def __init__(self, dest, jobs=None):
+        self.dest = Path(dest)
+        self.path = self.dest / self.filename
+        self.jobs = jobs
+        self.suffixes = available()
+        self.previous = {}
+        self.entries = {}
+
+    def load(self):
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == self.version:
+            self.previous = data["files"]
+            if data.get("suffixes") != self.suffixes:
+                # Everything is compressed again, the digests only tell which
+                # sidecars exist
+                for entry in self.previous.values():
+                    entry["sha256"] = None
+
+    def save(self):
+        data = {"version": self.version, "suffixes": self.suffixes, "files": self.entries}
+        replace(self.path, json.dumps(data, indent=1, sort_keys=True))
+
+    def run(self, outputs):
+        self.load()
+        pending = []
+        for key in sorted(outputs):
+            if posixpath.splitext(key)[1].lower() not in EXTENSIONS:
+                continue
+            path = str(self.dest / key)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entry = self.previous.get(key)
+            if (
+                entry is not None
+                and entry["sha256"] is not None
+                and [entry["mtime"], entry["size"]] == [stat.st_mtime_ns, stat.st_size]
+                and all(os.path.exists(path + suffix) for suffix in entry["written"])
+            ):
+                self.entries[key] = entry
+                continue
+            previous = entry["sha256"] if entry is not None else None
+            written = entry["written"] if entry is not None else []
+            pending.append((key, path, stat, previous, written))
+
+        compressed = []
+        for (key, path, stat, previous, written), result in zip(pending, self.compress(pending)):
+            digest, written, changed = result
+            self.entries[key] = {
+                "mtime": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": digest,
+                "written": written,
+            }
+            if changed:
+                compressed.append(key)
+
+        for key, entry in self.previous.items():
+            if key not in self.entries:
+                for suffix in entry["written"]:
+                    if os.path.lexists(self.dest / (key + suffix)):
+                        os.unlink(self.dest / (key + suffix))
+        self.save()
+        return compressed
+
+    def compress(self, pending):
+        arguments = [
+            [path for key, path, stat, previous, written in pending],
+            [previous for key, path, stat, previous, written in pending],
+            [self.suffixes] * len(pending),
+            [written for key, path, stat, previous, written in pending],
+        ]
+        if len(pending) < 2 or self.jobs == 1:
+            return list(map(compress_file, *arguments))
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = self.jobs or os.cpu_count() or 1
+        chunksize = max(1, len(pending) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(compress_file, *arguments, chunksize=chunksize))
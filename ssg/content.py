@@ -1,26 +1,111 @@
 import re
+import sys
 
 from collections.abc import Mapping
-from yaml import load, FullLoader
+from ssg.profile import stage
+
+
+class Body:
+    # Where a body starts on disk, it is only read when first used
+    __slots__ = ("path", "offset")
+
+    def __init__(self, path, offset):
+        self.path = path
+        self.offset = offset
+
+    def read(self):
+        return Content.read_body(self.path, self.offset)
+
+
+def intern_keys(metadata):
+    # Every page repeats the same few keys, so they share one string each
+    if not metadata:
+        return {}
+    return {
+        sys.intern(key) if type(key) is str else key: value
+        for key, value in metadata.items()
+    }
 
 
 class Content(Mapping):
+    # Whole-site listings hold every page at once, so instances stay small:
+    # just the metadata and the body, or a handle to load it from
+    __slots__ = ("data", "handle")
     __delimiter = r"^(?:-|\+){3}\s*$"
     __regex = re.compile(__delimiter, re.MULTILINE)
+    # Front matter is treated as untrusted unless a site opts in
+    trusted = False
+
+    @classmethod
+    def loader(cls):
+        from yaml import FullLoader, SafeLoader
+
+        # libyaml's loaders are an order of magnitude faster when PyYAML was built with them
+        try:
+            from yaml import CFullLoader as FullLoader, CSafeLoader as SafeLoader
+        except ImportError:
+            pass
+        return FullLoader if cls.trusted else SafeLoader
 
     @classmethod
-    def load(cls, string):
+    def parse_front_matter(cls, fm, cache=None):
+        from yaml import load
+
+        with stage("front-matter"):
+            if cache is not None:
+                return cache.load(fm, cls.loader())
+            return load(fm, Loader=cls.loader())
+
+    @classmethod
+    def load(cls, string, cache=None):
         _, fm, content = cls.__regex.split(string, 2)
-        metadata = load(fm, Loader=FullLoader)
+        metadata = cls.parse_front_matter(fm, cache)
         return cls(metadata, content)
 
-    def __init__(self, metadata, content):
-        self.data = metadata
-        self.data["content"] = content
+    @classmethod
+    def read(cls, path, cache=None):
+        fm, offset = cls.read_front_matter(path)
+        metadata = cls.parse_front_matter(fm, cache) or {}
+        return cls(metadata, Body(path, offset))
+
+    @classmethod
+    def read_front_matter(cls, path):
+        # Stops at the closing delimiter, so large bodies are never read
+        lines = []
+        opened = False
+        with open(path, "rb") as file:
+            for line in iter(file.readline, b""):
+                text = line.decode("utf-8")
+                if cls.__regex.match(text):
+                    if opened:
+                        offset = file.tell() - len(line) + len(text.rstrip())
+                        return "".join(lines), offset
+                    opened = True
+                elif opened:
+                    lines.append(text)
+        raise ValueError("{} has no front matter".format(path))
+
+    @staticmethod
+    def read_body(path, offset):
+        with open(path, "rb") as file:
+            file.seek(offset)
+            text = file.read().decode("utf-8")
+        # Match Content.load, which keeps the newline that ends the delimiter's
+        # trailing whitespace but drops any blank lines before it
+        body = text.lstrip()
+        if not body:
+            return ""
+        return text[text.rfind("\n", 0, len(text) - len(body)) :]
+
+    def __init__(self, metadata, content=None):
+        self.data = intern_keys(metadata)
+        self.handle = content
 
     @property
     def body(self):
-        return self.data["content"]
+        if isinstance(self.handle, Body):
+            self.handle = self.handle.read()
+        return self.handle
 
     @property
     def type(self):
@@ -34,14 +119,10 @@ class Content(Mapping):
         return self.data[key]
 
     def __iter__(self):
-        self.data.__iter__()
+        return self.data.__iter__()
 
     def __len__(self):
         return len(self.data)
 
     def __repr__(self):
-        data = {}
-        for key, value in self.data.items():
-            if key != "content":
-                data[key] = value
-        return str(data)
+        return str(self.data)
@@ -0,0 +1,178 @@
+import os
+import re
+import json
+import hashlib
+import posixpath
+
+from pathlib import Path
+from ssg.output import file_digest, link_or_copy, replace
+
+EXTENSIONS = [".css", ".js", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico", ".woff", ".woff2", ".ttf"]
+PAGES = [".html", ".htm"]
+
+# Both keep the text before and after the reference in groups 1, 2 and 4
+ATTRIBUTE = re.compile(r"""(\b(?:href|src)\s*=\s*)(["'])(.*?)(\2)""", re.I)
+CSS_URL = re.compile(r"""(url\(\s*)(["']?)([^"')]+)(\2\s*\))""", re.I)
+EXTERNAL = re.compile(r"^(?:[a-z][a-z0-9+.-]*:|//|#)", re.I)
+
+
+class Fingerprinter:
+    # Copies every asset output to name.<hash>.ext and points the pages at the
+    # copies. The hashed names never change content, so they can be cached
+    # forever, the originals stay in place for anything that is not rewritten.
+    filename = "assets-manifest.json"
+    version = 1
+    length = 8
+
+    def __init__(self, dest):
+        self.dest = Path(dest)
+        self.path = self.dest / self.filename
+        self.previous = {"assets": {}, "pages": {}}
+        self.assets = {}
+        self.stats = {}
+        self.pages = {}
+        self.originals = {}
+
+    def __getstate__(self):
+        # Pool workers only rewrite pages, they need the mapping and no more
+        return {"dest": self.dest, "assets": self.assets, "originals": self.originals}
+
+    def __setstate__(self, state):
+        self.__init__(state["dest"])
+        self.assets = state["assets"]
+        self.originals = state["originals"]
+
+    def load(self):
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == self.version:
+            self.previous = data
+
+    def save(self):
+        data = {
+            "version": self.version,
+            "assets": {
+                key: dict(self.stats[key], hashed=hashed) for key, hashed in self.assets.items()
+            },
+            "pages": self.pages,
+        }
+        replace(self.path, json.dumps(data, indent=1, sort_keys=True))
+
+    @classmethod
+    def hashed(cls, key, digest):
+        name, extension = posixpath.splitext(key)
+        return "{}.{}{}".format(name, digest[: cls.length], extension)
+
+    def restore(self):
+        # The hashes of the last run, so pages are written already pointing at
+        # them and an unchanged page still matches the copy on disk
+        self.load()
+        self.assets = {key: entry["hashed"] for key, entry in self.previous["assets"].items()}
+        self.originals = {hashed: key for key, hashed in self.assets.items()}
+        return self
+
+    def page(self, path, content):
+        try:
+            key = Path(path).relative_to(self.dest).as_posix()
+        except ValueError:
+            return content
+        if not self.assets or posixpath.splitext(key)[1].lower() not in PAGES:
+            return content
+        if isinstance(content, bytes):
+            content = content.decode("utf-8")
+        return self.rewrite(content, key, [ATTRIBUTE, CSS_URL])
+
+    def run(self, outputs):
+        self.load()
+        previous = {key: entry["hashed"] for key, entry in self.previous["assets"].items()}
+        self.originals = {hashed: key for key, hashed in previous.items()}
+
+        outputs = sorted(outputs)
+        assets = [key for key in outputs if posixpath.splitext(key)[1].lower() in EXTENSIONS]
+        # Stylesheets go last so the images and fonts they use are hashed already
+        for key in sorted(assets, key=lambda key: key.lower().endswith(".css")):
+            if (self.dest / key).is_file():
+                self.assets[key] = self.fingerprint(key)
+
+        # Pages are only read again when they or the hashes changed
+        changed = self.assets != previous
+        for key in outputs:
+            if posixpath.splitext(key)[1].lower() in PAGES and (self.dest / key).is_file():
+                self.rewrite_page(key, changed)
+
+        for key, hashed in previous.items():
+            if self.assets.get(key) != hashed and (self.dest / hashed).is_file():
+                (self.dest / hashed).unlink()
+        self.save()
+        return self.assets
+
+    def fingerprint(self, key):
+        path = self.dest / key
+        stat = os.stat(path)
+        self.stats[key] = {"mtime": stat.st_mtime_ns, "size": stat.st_size}
+
+        if key.lower().endswith(".css"):
+            with open(path, "r", encoding="utf-8") as file:
+                data = self.rewrite(file.read(), key, [CSS_URL]).encode("utf-8")
+            hashed = self.hashed(key, hashlib.sha256(data).hexdigest())
+            if not (self.dest / hashed).is_file():
+                replace(self.dest / hashed, data)
+            return hashed
+
+        entry = self.previous["assets"].get(key)
+        if entry is not None and [entry["mtime"], entry["size"]] == [stat.st_mtime_ns, stat.st_size]:
+            hashed = entry["hashed"]
+        else:
+            hashed = self.hashed(key, file_digest(path))
+        # Same name means same bytes, so an existing copy is never rewritten
+        if not (self.dest / hashed).is_file():
+            link_or_copy(path, self.dest / hashed)
+        return hashed
+
+    def rewrite_page(self, key, changed):
+        path = self.dest / key
+        stat = os.stat(path)
+        if not changed and self.previous["pages"].get(key) == [stat.st_mtime_ns, stat.st_size]:
+            self.pages[key] = [stat.st_mtime_ns, stat.st_size]
+            return
+        with open(path, "r", encoding="utf-8") as file:
+            text = file.read()
+        rewritten = self.rewrite(text, key, [ATTRIBUTE, CSS_URL])
+        if rewritten != text:
+            replace(path, rewritten)
+            stat = os.stat(path)
+        self.pages[key] = [stat.st_mtime_ns, stat.st_size]
+
+    def rewrite(self, text, base, patterns):
+        def substitute(match):
+            reference = self.resolve(match.group(3), base)
+            if reference is None:
+                return match.group(0)
+            return match.group(1) + match.group(2) + reference + match.group(4)
+
+        for pattern in patterns:
+            text = pattern.sub(substitute, text)
+        return text
+
+    def resolve(self, reference, base):
+        if not reference or EXTERNAL.match(reference):
+            return None
+        path, rest = re.match(r"([^?#]*)(.*)", reference, re.S).groups()
+        directory = posixpath.dirname(base)
+        if path.startswith("/"):
+            key = posixpath.normpath(path.lstrip("/"))
+        else:
+            key = posixpath.normpath(posixpath.join(directory, path))
+        # Pages left from an earlier run may already point at an old hash
+        key = self.originals.get(key, key)
+        hashed = self.assets.get(key)
+        if hashed is None:
+            return None
+        if path.startswith("/"):
+            target = "/" + hashed
+        else:
+            target = posixpath.relpath(hashed, directory or ".")
+        return target + rest
@@ -0,0 +1,141 @@
+import json
+import datetime
+
+from pathlib import Path
+from ssg.content import Content, intern_keys
+from ssg.output import replace
+
+
+class ContentIndex:
+    filename = ".ssg-index.json"
+    version = 1
+    date_formats = ["%Y-%m-%d", "%m-%d-%Y", "%Y-%m-%d %H:%M:%S"]
+
+    def __init__(self, source, dest, cache=None):
+        self.source = Path(source)
+        self.dest = Path(dest)
+        self.path = self.dest / self.filename
+        self.cache = cache
+        self.entries = {}
+        self.stats = {}
+        self.types = {}
+        self.tags = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def key(self, path):
+        return Path(path).relative_to(self.source).as_posix()
+
+    @classmethod
+    def normalize(cls, value):
+        if isinstance(value, datetime.datetime):
+            return value.isoformat(sep=" ")
+        if isinstance(value, datetime.date):
+            return value.isoformat()
+        if isinstance(value, dict):
+            return {str(key): cls.normalize(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple, set)):
+            return [cls.normalize(item) for item in value]
+        return value
+
+    @classmethod
+    def sort_date(cls, value):
+        # Dates are compared as ISO strings, whatever format the author used
+        if not isinstance(value, str):
+            return ""
+        for date_format in cls.date_formats:
+            try:
+                return datetime.datetime.strptime(value, date_format).isoformat()
+            except ValueError:
+                continue
+        return value
+
+    @staticmethod
+    def split_tags(tags):
+        if tags is None:
+            return []
+        if isinstance(tags, str):
+            tags = tags.split(",")
+        return [str(tag).strip() for tag in tags if str(tag).strip()]
+
+    def load(self):
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != self.version:
+            return
+        for key, entry in data.get("entries", {}).items():
+            self.stats[key] = (entry["size"], entry["mtime"])
+            self.add(key, entry["metadata"])
+
+    def save(self):
+        self.dest.mkdir(parents=True, exist_ok=True)
+        entries = {}
+        for key, metadata in self.entries.items():
+            size, mtime = self.stats[key]
+            entries[key] = {"size": size, "mtime": mtime, "metadata": metadata}
+        replace(self.path, json.dumps({"version": self.version, "entries": entries}, sort_keys=True))
+
+    def add(self, key, metadata):
+        self.remove(key)
+        metadata = intern_keys(self.normalize(metadata))
+        self.entries[key] = metadata
+        self.types.setdefault(metadata.get("type"), set()).add(key)
+        for tag in self.split_tags(metadata.get("tags")):
+            self.tags.setdefault(tag, set()).add(key)
+
+    def remove(self, key):
+        metadata = self.entries.pop(key, None)
+        if metadata is None:
+            return
+        self.types.get(metadata.get("type"), set()).discard(key)
+        for tag in self.split_tags(metadata.get("tags")):
+            self.tags.get(tag, set()).discard(key)
+
+    def scan(self, path):
+        from yaml import YAMLError
+
+        key = self.key(path)
+        stat = path.stat()
+        signature = (stat.st_size, stat.st_mtime_ns)
+        if key in self.entries and self.stats.get(key) == signature:
+            return self.entries[key]
+        try:
+            content = Content.read(path, self.cache)
+        except (ValueError, YAMLError, UnicodeDecodeError):
+            self.remove(key)
+            return None
+        self.stats[key] = signature
+        self.add(key, content.data)
+        return self.entries[key]
+
+    def retain(self, keys):
+        for key in list(self.entries):
+            if key not in keys:
+                self.remove(key)
+                self.stats.pop(key, None)
+
+    def get(self, path):
+        key = path if isinstance(path, str) else self.key(path)
+        return self.entries.get(key)
+
+    def query(self, type=None, tag=None, order=None, reverse=False):
+        keys = set(self.entries)
+        if type is not None:
+            keys &= self.types.get(type, set())
+        if tag is not None:
+            keys &= self.tags.get(tag, set())
+
+        if order == "date":
+            sort_key = lambda key: (self.sort_date(self.entries[key].get("date")), key)
+        elif order is not None:
+            sort_key = lambda key: (str(self.entries[key].get(order, "")), key)
+        else:
+            sort_key = None
+        return [(key, self.entries[key]) for key in sorted(keys, key=sort_key, reverse=reverse)]
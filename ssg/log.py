@@ -0,0 +1,191 @@
+import sys
+import json
+import time
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+NAMES = {DEBUG: "debug", INFO: "info", WARNING: "warning", ERROR: "error"}
+COLOURS = {DEBUG: "\x1b[1;32m", INFO: "\x1b[1;33m", WARNING: "\x1b[1;33m", ERROR: "\x1b[1;31m"}
+
+
+class Logger:
+    # Console lines are held back during a build and written in batches,
+    # records below the threshold are dropped before anything is formatted
+    def __init__(
+        self,
+        level=INFO,
+        json_path=None,
+        progress=True,
+        interval=0.1,
+        batch=64,
+        stream=None,
+        errors=None,
+    ):
+        self.level = level
+        self.stream = stream
+        self.errors = errors
+        self.json = None
+        if json_path:
+            self.json = open(json_path, "w", encoding="UTF-8", buffering=1 << 16)
+        # The JSON log keeps every record, the console only those at level
+        self.threshold = DEBUG if self.json is not None else level
+        self.progress = progress
+        self.interval = interval
+        self.batch = batch
+        self.lines = []
+        self.counts = {}
+        self.building = False
+        self.shown = False
+        self.started = 0.0
+        self.shown_at = 0.0
+
+    def output(self, error=False):
+        # Looked up on use so redirected streams are honoured
+        if error:
+            return self.errors or sys.stderr
+        return self.stream or sys.stdout
+
+    def log(self, level, event, message, fields, when=None):
+        if level < self.threshold:
+            return
+        when = time.time() if when is None else when
+        text = message.format(**fields) if fields else message
+        if self.json is not None:
+            record = {"time": when, "level": NAMES[level], "event": event, "message": text}
+            record.update(fields)
+            self.json.write(json.dumps(record, default=str) + "\n")
+        if level < self.level:
+            return
+        self.lines.append((level, text))
+        if not self.building or level >= WARNING or len(self.lines) >= self.batch:
+            self.flush()
+
+    def count(self, event):
+        self.counts[event] = self.counts.get(event, 0) + 1
+        if self.progress and self.level <= INFO:
+            now = time.perf_counter()
+            if now - self.shown_at >= self.interval:
+                self.shown_at = now
+                self.show()
+
+    def tally(self):
+        return "{} built, {} up to date, {} failed".format(
+            self.counts.get("built", 0),
+            self.counts.get("skipped", 0),
+            self.counts.get("failed", 0),
+        )
+
+    def show(self):
+        # Progress rewrites a single line, and only on a terminal
+        stream = self.output()
+        if not stream.isatty():
+            return
+        self.flush()
+        stream.write("\r\x1b[2K{}".format(self.tally()))
+        stream.flush()
+        self.shown = True
+
+    def clear(self):
+        if self.shown:
+            self.output().write("\r\x1b[2K")
+            self.shown = False
+
+    def flush(self):
+        if self.lines:
+            self.clear()
+            lines, self.lines = self.lines, []
+            for level, text in lines:
+                stream = self.output(level >= ERROR)
+                if stream.isatty():
+                    text = COLOURS[level] + text + "\x1b[0m"
+                stream.write(text + "\n")
+            self.output().flush()
+            self.output(True).flush()
+        if self.json is not None:
+            self.json.flush()
+
+    def start(self):
+        self.counts = {}
+        self.building = True
+        self.started = time.perf_counter()
+
+    def finish(self):
+        self.building = False
+        self.log(
+            INFO,
+            "summary",
+            "Built {built} file(s), {skipped} up to date, {failed} failed in {seconds:.2f} s",
+            {
+                "built": self.counts.get("built", 0),
+                "skipped": self.counts.get("skipped", 0),
+                "failed": self.counts.get("failed", 0),
+                "seconds": time.perf_counter() - self.started,
+            },
+        )
+        self.flush()
+
+    def close(self):
+        self.flush()
+        self.clear()
+        if self.json is not None:
+            self.json.close()
+            self.json = None
+
+
+class Recorder:
+    # Stands in for the logger in pool workers, records travel back to the
+    # parent with the outputs and are written there
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.records = []
+
+    def log(self, level, event, message, fields, when=None):
+        if level >= self.threshold:
+            self.records.append((level, event, message, fields, time.time()))
+
+    def count(self, event):
+        pass
+
+    def drain(self):
+        records, self.records = self.records, []
+        return records
+
+
+current = Logger()
+
+
+def activate(logger):
+    global current
+    previous = current
+    current = logger
+    return previous
+
+
+def debug(message, event="message", **fields):
+    if DEBUG >= current.threshold:
+        current.log(DEBUG, event, message, fields)
+
+
+def info(message, event="message", **fields):
+    if INFO >= current.threshold:
+        current.log(INFO, event, message, fields)
+
+
+def warning(message, event="message", **fields):
+    current.log(WARNING, event, message, fields)
+
+
+def error(message, event="message", **fields):
+    current.log(ERROR, event, message, fields)
+
+
+def count(event):
+    current.count(event)
+
+
+def replay(records):
+    for level, event, message, fields, when in records:
+        current.log(level, event, message, fields, when)
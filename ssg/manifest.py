@@ -0,0 +1,188 @@
+import json
+
+from pathlib import Path
+from ssg.output import file_digest, replace
+
+
+class Manifest:
+    filename = ".ssg-manifest.json"
+    version = 2
+
+    def __init__(self, source, dest):
+        self.source = Path(source)
+        self.dest = Path(dest)
+        self.path = self.dest / self.filename
+        self.entries = {}
+        self.seen = set()
+        self.signatures = {}
+
+    @staticmethod
+    def parser_name(parser):
+        return type(parser).__name__
+
+    def key(self, path):
+        return Path(path).relative_to(self.source).as_posix()
+
+    def output_key(self, output):
+        return Path(output).relative_to(self.dest).as_posix()
+
+    def load(self):
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == self.version:
+            self.entries = data.get("entries", {})
+
+    def save(self):
+        self.dest.mkdir(parents=True, exist_ok=True)
+        data = {"version": self.version, "entries": self.entries}
+        replace(self.path, json.dumps(data, indent=1, sort_keys=True))
+
+    def signature(self, dependency):
+        # Fragments are shared by many pages, so hash each one once per build
+        if dependency not in self.signatures:
+            try:
+                stat = Path(dependency).stat()
+            except OSError:
+                self.signatures[dependency] = None
+            else:
+                self.signatures[dependency] = {
+                    "size": stat.st_size,
+                    "mtime": stat.st_mtime_ns,
+                    "hash": file_digest(dependency),
+                }
+        return self.signatures[dependency]
+
+    def changed(self, dependency, recorded):
+        try:
+            stat = Path(dependency).stat()
+        except OSError:
+            return True
+        if recorded["size"] != stat.st_size:
+            return True
+        if recorded["mtime"] == stat.st_mtime_ns:
+            return False
+        # Touched but possibly unchanged, fall back to the content hash
+        signature = self.signature(dependency)
+        if signature is None or signature["hash"] != recorded["hash"]:
+            return True
+        recorded["mtime"] = stat.st_mtime_ns
+        return False
+
+    # Returns the outputs of `path` that need rebuilding, or None for all of them
+    def outdated(self, path, parser):
+        key = self.key(path)
+        self.seen.add(key)
+        entry = self.entries.get(key)
+        if entry is None or entry["parser"] != self.parser_name(parser):
+            return None
+        if self.changed(path, entry):
+            return None
+        if not all((self.dest / output).exists() for output in entry["outputs"]):
+            return None
+
+        dependencies = entry["dependencies"]
+        changed = {
+            dependency
+            for dependency, recorded in dependencies.items()
+            if self.changed(dependency, recorded)
+        }
+        return {
+            self.dest / output
+            for output, graph in entry["outputs"].items()
+            if changed.intersection(graph)
+        }
+
+    def update(self, path, parser, built, targets=None):
+        key = self.key(path)
+        outputs = {}
+        previous = self.entries.get(key)
+        if targets is not None and previous is not None:
+            # Partial rebuild, keep the graph of the outputs that were skipped
+            outputs.update(previous["outputs"])
+
+        for output, graph in built.items():
+            try:
+                outputs[self.output_key(output)] = sorted(
+                    dependency.as_posix() for dependency in graph
+                )
+            except ValueError:
+                continue
+
+        dependencies = {}
+        for graph in outputs.values():
+            for dependency in graph:
+                signature = self.signature(dependency)
+                if signature is not None:
+                    dependencies[dependency] = signature
+
+        stat = path.stat()
+        self.seen.add(key)
+        self.entries[key] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "hash": file_digest(path),
+            "parser": self.parser_name(parser),
+            "outputs": outputs,
+            "dependencies": dependencies,
+        }
+        if targets is None and previous is not None:
+            # A full rebuild knows every output, the rest are no longer produced
+            return self.retire(set(previous["outputs"]).difference(outputs))
+        return []
+
+    def discard(self, path):
+        key = self.key(path)
+        self.seen.add(key)
+        self.entries.pop(key, None)
+
+    def dependents(self, dependency):
+        dependency = Path(dependency).as_posix()
+        found = {}
+        for key, entry in self.entries.items():
+            if (self.source / key).as_posix() == dependency:
+                found[key] = sorted(entry["outputs"])
+                continue
+            outputs = [
+                output
+                for output, graph in entry["outputs"].items()
+                if dependency in graph
+            ]
+            if outputs:
+                found[key] = sorted(outputs)
+        return found
+
+    def outputs(self):
+        return {output for entry in self.entries.values() for output in entry["outputs"]}
+
+    def prune(self):
+        return self.drop([key for key in self.entries if key not in self.seen])
+
+    def remove(self, path):
+        # A deleted directory takes every source recorded below it
+        key = self.key(path)
+        prefix = key + "/"
+        return self.drop(
+            [entry for entry in self.entries if entry == key or entry.startswith(prefix)]
+        )
+
+    def drop(self, keys):
+        orphans = set()
+        for key in keys:
+            orphans.update(self.entries.pop(key)["outputs"])
+        return self.retire(orphans)
+
+    def retire(self, orphans):
+        # Outputs such as shared CSS can be claimed by a source that still exists
+        for entry in self.entries.values():
+            orphans.difference_update(entry["outputs"])
+
+        removed = []
+        for output in sorted(orphans):
+            full_path = self.dest / output
+            if full_path.is_file():
+                full_path.unlink()
+                removed.append(full_path)
+        return removed
@@ -0,0 +1,239 @@
+import io
+import os
+import errno
+import hashlib
+import shutil
+import tempfile
+
+from pathlib import Path
+
+# From linux/fs.h, swaps two paths in a single rename
+RENAME_EXCHANGE = 2
+AT_FDCWD = -100
+
+# Read once at import, setting it is the only way to look at it
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
+class MemoryFile(io.StringIO):
+    def __init__(self, output, path):
+        super().__init__()
+        self.output = output
+        self.path = path
+
+    def close(self):
+        if not self.closed:
+            self.output.write(self.path, self.getvalue())
+        super().close()
+
+
+class MemoryOutput:
+    # Output store for the dev server, nothing it is given touches the disk.
+    # Copied assets are kept as the path of their source and read when served.
+    persistent = False
+
+    def __init__(self):
+        self.files = {}
+
+    @staticmethod
+    def key(path):
+        return Path(path).as_posix()
+
+    def __contains__(self, path):
+        return self.key(path) in self.files
+
+    def __len__(self):
+        return len(self.files)
+
+    def open(self, path):
+        return MemoryFile(self, path)
+
+    def write(self, path, content):
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        self.files[self.key(path)] = content
+
+    def copy(self, path, target):
+        self.files[self.key(target)] = Path(path)
+
+    def read(self, path):
+        data = self.files.get(self.key(path))
+        if isinstance(data, Path):
+            try:
+                with open(data, "rb") as file:
+                    return file.read()
+            except OSError:
+                return None
+        return data
+
+    def discard(self, path):
+        self.files.pop(self.key(path), None)
+
+    def makedirs(self, directory):
+        pass
+
+
+class DiskOutput:
+    # Every file is assembled in memory and written with one call, files whose
+    # bytes did not change are left alone so their mtime and inode survive
+    persistent = True
+
+    def __init__(self, assets=None, rewriter=None):
+        self.assets = assets
+        # Rewrites pages before they are compared, see Fingerprinter.page
+        self.rewriter = rewriter
+        self.written = 0
+        self.unchanged = 0
+
+    def __getstate__(self):
+        return {"assets": self.assets, "rewriter": self.rewriter}
+
+    def __setstate__(self, state):
+        self.__init__(state["assets"], state["rewriter"])
+
+    def open(self, path):
+        return MemoryFile(self, path)
+
+    @staticmethod
+    def same(path, data):
+        try:
+            if os.stat(path).st_size != len(data):
+                return False
+            with open(path, "rb") as file:
+                return file.read() == data
+        except OSError:
+            return False
+
+    def write(self, path, content):
+        if self.rewriter is not None:
+            content = self.rewriter.page(path, content)
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        if self.same(path, content):
+            self.unchanged += 1
+            return
+        replace(path, content)
+        self.written += 1
+
+    def copy(self, path, target):
+        try:
+            self.transfer(path, target)
+        except FileNotFoundError:
+            # Another worker may have made the directory in the meantime, so
+            # only a missing source is an error
+            if not os.path.exists(path):
+                raise
+            Path(target).parent.mkdir(parents=True, exist_ok=True)
+            self.transfer(path, target)
+
+    def transfer(self, path, target):
+        if self.assets is None:
+            shutil.copy2(path, target)
+        else:
+            self.assets.copy(path, target)
+
+    def read(self, path):
+        try:
+            with open(path, "rb") as file:
+                return file.read()
+        except OSError:
+            return None
+
+    def makedirs(self, directory):
+        # Left to write and copy, which make directories on first use
+        pass
+
+
+def replace(path, content):
+    # Replacing rather than truncating never writes through a hardlink into a
+    # tree that is still being served
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    path = Path(path)
+    prefix = ".{}.".format(path.name)
+    try:
+        descriptor, temporary = tempfile.mkstemp(".tmp", prefix, path.parent)
+    except FileNotFoundError:
+        # Directories are only created once something is written to them
+        path.parent.mkdir(parents=True, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(".tmp", prefix, path.parent)
+    try:
+        # mkstemp creates the file private, give it the usual permissions
+        if hasattr(os, "fchmod"):
+            os.fchmod(descriptor, 0o666 & ~UMASK)
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(content)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.lexists(temporary):
+            os.unlink(temporary)
+        raise
+
+
+def file_digest(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 16), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def link_or_copy(path, target):
+    try:
+        os.link(path, target)
+    except OSError:
+        shutil.copy2(path, target)
+
+
+def exchange(first, second):
+    try:
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        renameat2 = libc.renameat2
+    except (OSError, AttributeError):
+        return False
+    result = renameat2(
+        AT_FDCWD, os.fsencode(first), AT_FDCWD, os.fsencode(second), RENAME_EXCHANGE
+    )
+    if result != 0:
+        error = ctypes.get_errno()
+        if error in (errno.EINVAL, errno.ENOSYS, errno.EPERM, errno.ENOTSUP):
+            return False
+        raise OSError(error, os.strerror(error), str(first))
+    return True
+
+
+class StagingArea:
+    # A hardlinked copy of dest that a build can write into while dest is
+    # still being served, and which replaces dest only if the build succeeds
+    def __init__(self, dest):
+        self.dest = Path(dest)
+        self.path = self.dest.with_name("." + self.dest.name + ".staging")
+        self.old = self.dest.with_name("." + self.dest.name + ".old")
+
+    def open(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        shutil.rmtree(self.old, ignore_errors=True)
+        if self.dest.is_dir():
+            shutil.copytree(self.dest, self.path, symlinks=True, copy_function=link_or_copy)
+        else:
+            self.path.mkdir(parents=True)
+        return self.path
+
+    def commit(self):
+        if not self.dest.exists():
+            os.rename(self.path, self.dest)
+        elif exchange(self.path, self.dest):
+            # The staging path now holds the previous tree
+            shutil.rmtree(self.path, ignore_errors=True)
+        else:
+            # Without renameat2 there is a moment with no dest at all
+            os.rename(self.dest, self.old)
+            os.rename(self.path, self.dest)
+            shutil.rmtree(self.old, ignore_errors=True)
+
+    def abort(self):
+        shutil.rmtree(self.path, ignore_errors=True)
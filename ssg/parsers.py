@@ -1,21 +1,60 @@
 from re import template
 import shutil
-import sys
 import os
+import json
+import copy
 
 from typing import List
 from pathlib import Path
 
-from docutils.core import publish_parts
-from markdown import markdown
 from ssg.content import Content
+from ssg.cache import FragmentCache, RenderCache
+from ssg import log
+from ssg.profile import stage
 from collections import OrderedDict
 
 import json as luday_parser
 
+# Layouts shipped with ssg, web/<framework>/layouts can override any of them
+LAYOUTS = Path(__file__).parent / "layouts"
+
+
+def stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
 
 class Parser:
     extensions: List[str] = []
+    priority: int = 0
+    front_matter: bool = False
+
+    def __init__(self):
+        self.assets = None
+        self.content_index = None
+        self.metadata_cache = None
+        self.output = None
+        self.reset()
+
+    def setup(self, site):
+        self.assets = site.assets
+        self.content_index = site.content_index
+        self.metadata_cache = site.metadata_cache
+        self.output = site.output
+
+    def reset(self, targets=None):
+        self.outputs = {}
+        self.targets = targets
+
+    def record(self, output, dependencies=()):
+        graph = self.outputs.setdefault(Path(output), set())
+        graph.update(Path(dependency) for dependency in dependencies)
+
+    def wants(self, output):
+        return self.targets is None or Path(output) in self.targets
 
     def valid_extension(self, extension):
         return extension in self.extensions
@@ -29,12 +68,41 @@ class Parser:
 
     def write(self, path, dest, content, ext=".html"):
         full_path = dest / path.with_suffix(ext).name
+        if self.output is not None:
+            self.output.write(full_path, content)
+            self.record(full_path)
+            return
         with open(full_path, "w") as file:
             file.write(content)
+        self.record(full_path)
+
+    def open_output(self, path):
+        if self.output is not None:
+            return self.output.open(path)
+        return open(path, "w", encoding="UTF-8", buffering=1 << 16)
+
+    def makedirs(self, directory):
+        if self.output is None:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+        else:
+            self.output.makedirs(directory)
 
     def copy(self, path, source, dest):
-        shutil.copy2(path, dest / path.relative_to(source))
-        # print(path)
+        if self.assets is None:
+            shutil.copy2(path, dest / path.relative_to(source))
+            self.record(dest / path.relative_to(source))
+        else:
+            self.install(path, dest / path.relative_to(source))
+
+    def install(self, path, target, dependencies=()):
+        with stage("copy"):
+            if self.output is not None:
+                self.output.copy(path, target)
+            elif self.assets is None:
+                shutil.copy2(path, target)
+            else:
+                self.assets.copy(path, target)
+        self.record(target, dependencies)
 
 
 class ResourceParser(Parser):
@@ -46,167 +114,284 @@ class ResourceParser(Parser):
 
 class MarkdownParser(Parser):
     extensions = [".md", ".markdown"]
+    front_matter = True
+
+    def __init__(self, markdown_extensions=None, extension_configs=None):
+        super().__init__()
+        self.markdown_extensions = markdown_extensions or []
+        self.extension_configs = extension_configs or {}
+        self.renderer = None
+        self.render_cache = None
+
+    def __getstate__(self):
+        # Markdown instances don't pickle, each worker builds its own
+        state = self.__dict__.copy()
+        state["renderer"] = None
+        return state
+
+    def setup(self, site):
+        super().setup(site)
+        if site.cache_dir is not None:
+            self.render_cache = RenderCache(site.cache_dir / "markdown")
+
+    def markdown(self, body):
+        from markdown import Markdown, __version__ as markdown_version
+
+        key = None
+        if self.render_cache is not None:
+            config = json.dumps(
+                [self.markdown_extensions, self.extension_configs],
+                sort_keys=True,
+                default=repr,
+            )
+            key = self.render_cache.key(markdown_version, config, body)
+            html = self.render_cache.get(key)
+            if html is not None:
+                return html
+
+        with stage("markdown"):
+            if self.renderer is None:
+                self.renderer = Markdown(
+                    extensions=self.markdown_extensions,
+                    extension_configs=self.extension_configs,
+                )
+            html = self.renderer.reset().convert(body)
+        if key is not None:
+            self.render_cache.put(key, html)
+        return html
 
     def parse(self, path, source, dest):
-        content = Content.load(self.read(path))
-        html = markdown(content.body)
+        content = Content.load(self.read(path), self.metadata_cache)
+        html = self.markdown(content.body)
         self.write(path, dest, html)
-        sys.stdout.write(
-            "\x1b[1;32m{} converted to HTML. Metadata: {}\n".format(path.name, content)
+        log.debug(
+            "{name} converted to HTML. Metadata: {metadata}",
+            "converted",
+            name=path.name,
+            metadata=content.data,
         )
 
 
 class ReStructuredTextParser(Parser):
     extensions = [".rst"]
+    front_matter = True
+
+    def __init__(self, settings_overrides=None):
+        super().__init__()
+        self.settings_overrides = settings_overrides or {}
+        self.publishers = {}
+        self.render_cache = None
+
+    def __getstate__(self):
+        # Docutils components don't pickle, each worker builds its own
+        state = self.__dict__.copy()
+        state["publishers"] = {}
+        return state
+
+    def setup(self, site):
+        super().setup(site)
+        if site.cache_dir is not None:
+            self.render_cache = RenderCache(site.cache_dir / "docutils")
+
+    def publisher(self, writer_name):
+        from docutils.core import Publisher
+
+        # Building the reader, parser, writer and settings is most of the cost
+        # of publish_parts, so do it once per writer and reuse them
+        if writer_name not in self.publishers:
+            publisher = Publisher()
+            publisher.set_components("standalone", "restructuredtext", writer_name)
+            publisher.process_programmatic_settings(
+                None, self.settings_overrides, None
+            )
+            self.publishers[writer_name] = publisher
+        return self.publishers[writer_name]
+
+    def publish_parts(self, body, writer_name="html5"):
+        import docutils
+        from docutils.core import publish_parts
+
+        key = None
+        if self.render_cache is not None:
+            settings = json.dumps(self.settings_overrides, sort_keys=True, default=repr)
+            key = self.render_cache.key(docutils.__version__, writer_name, settings, body)
+            parts = self.render_cache.get(key)
+            if parts is not None:
+                return parts
+
+        with stage("docutils"):
+            publisher = self.publisher(writer_name)
+            parts = publish_parts(
+                body,
+                reader=publisher.reader,
+                parser=publisher.parser,
+                writer=publisher.writer,
+                settings=copy.copy(publisher.settings),
+            )
+        if key is not None:
+            self.render_cache.put(key, parts)
+        return parts
 
     def parse(self, path, source, dest):
-        content = Content.load(self.read(path))
-        html = publish_parts(content.body, writer_name="html5")
+        content = Content.load(self.read(path), self.metadata_cache)
+        html = self.publish_parts(content.body, writer_name="html5")
         self.write(path, dest, html["html_body"])
-        sys.stdout.write(
-            "\x1b[1;32m{} converted to HTML. Metadata: {}\n".format(path.name, content)
+        log.debug(
+            "{name} converted to HTML. Metadata: {metadata}",
+            "converted",
+            name=path.name,
+            metadata=content.data,
         )
 
-class LudayHtmlParser(Parser):         
+class LudayHtmlParser(Parser):
     extensions = [".json"]
+    sectionFolders = {"header": "columns", "body": "columns", "footer": "footer"}
+
+    def __init__(self, cache_limit=32 * 1024 * 1024):
+        super().__init__()
+        self.fragments = FragmentCache(cache_limit)
+        self.environments = {}
+        self.layoutFiles = {}
+        self.template_cache = None
+
+    def __getstate__(self):
+        # Jinja environments don't pickle, each worker builds its own
+        state = self.__dict__.copy()
+        state["environments"] = {}
+        state["layoutFiles"] = {}
+        return state
+
+    def setup(self, site):
+        super().setup(site)
+        if site.cache_dir is not None:
+            self.template_cache = Path(site.cache_dir) / "templates"
+            self.environments = {}
+
+    def environment(self, framework):
+        from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+        # web/<framework>/layouts overrides the layouts shipped in ssg/layouts
+        environment = self.environments.get(framework)
+        if environment is None:
+            bytecodeCache = None
+            if self.template_cache is not None:
+                self.template_cache.mkdir(parents=True, exist_ok=True)
+                bytecodeCache = FileSystemBytecodeCache(str(self.template_cache))
+            environment = Environment(
+                loader=FileSystemLoader(["web/"+framework+"/layouts", str(LAYOUTS)]),
+                bytecode_cache=bytecodeCache,
+                trim_blocks=True,
+                finalize=lambda value: "" if value is None else value,
+            )
+            self.environments[framework] = environment
+        return environment
+
+    def layout(self, page, templateName):
+        framework = page['framework']
+        with stage("templates"):
+            return self.environment(framework).select_template([
+                templateName+"/"+page['name']+".html",
+                templateName+".html",
+                framework+".html",
+                "page.html",
+            ])
+
+    def layout_files(self, layout):
+        # The layout and every template it extends or includes, so the manifest
+        # rebuilds the page when any of them changes
+        cached = self.layoutFiles.get(layout.filename)
+        if cached is not None and cached[0] == [stamp(path) for path in cached[1]]:
+            return cached[1]
+
+        from jinja2 import meta
+
+        environment = layout.environment
+        files = []
+        names = [layout.name]
+        while names:
+            name = names.pop(0)
+            source, filename, _ = environment.loader.get_source(environment, name)
+            if Path(filename) in files:
+                continue
+            files.append(Path(filename))
+            referenced = meta.find_referenced_templates(environment.parse(source))
+            names.extend(name for name in referenced if name is not None)
+        self.layoutFiles[layout.filename] = ([stamp(path) for path in files], files)
+        return files
 
     def parse(self, path, source, dest):
-
-        obj = luday_parser.load(open(path))
-        content = None
-
-        if not obj:
-            content = {}
-        else:
-            try:
-                content = obj
-            except ValueError as e:
-                raise e
+        with open(path, 'r', encoding='UTF-8') as file:
+            content = luday_parser.load(file) or {}
 
         templateName = content['template']
         templatePages = content['pages']
         templateType = content['type']
 
         if templateType == "website":
-            """Loop through pages"""
             for page in templatePages:
-                templateFramework = page['framework']
-                templatePageName = page['name']
-                if templateFramework == "bootstrap":
-                    filePath = "web/bootstrap/main/"+templateName+"/"+templatePageName+".html"
-                    # check if file path exits
-                    if os.path.exists(filePath):
-                        cssFolder = "css"
-                        jsFolder = "js"
-                        assets_folder = "assets"
-                        image_folder = "img"
-                        pageName = templatePageName+".html"
-                        convertedOutput = ""
-
-                        templateDist = dest / templateName
-                        templateCssDist = dest / templateName / cssFolder
-                        templateJsDist = dest / templateName / jsFolder
-                        template_assets_dist = dest / templateName / assets_folder
-                        template_images = template_assets_dist /image_folder
-
-                        templateDist.mkdir(parents=True, exist_ok=True)
-
-                        if page.get('sections'):
-                            assets_path = "web/bootstrap/head/"+templateName+"/"+assets_folder
-                            # check if assets file path exits
-                            # if os.path.exists(assets_path):
-                            #     image_path = "web/bootstrap/head/"+templateName+"/"+assets_folder+"/"+image_folder
-                            #     if os.path.exists(image_path):
-                            #         print("exists")
-                            #         template_images.mkdir(parents=True, exist_ok=True)
-                            #         shutil.copy2(image_path, template_images.relative_to(image_path))
-                            with open(templateDist / pageName, 'w', encoding='UTF-8') as file:
-
-                                convertedOutput += '<!DOCTYPE html>\n'
-                                convertedOutput += '<html>\n<head>\n'
-                                convertedOutput += '\t<meta charset="utf-8">\n\t<meta http-equiv="X-UA-Compatible" content="IE=edge">\n\t<title>Luday Template</title>\n\t<meta name="description" content="">\n\t<meta name="viewport" content="width=device-width, initial-scale=1">\n\t<!-- Bootstrap icons-->\n\t<link href="https://cdn.jsdelivr.net/npm/bootstrap-icons@1.5.0/font/bootstrap-icons.css" rel="stylesheet" />\n\t<!-- Core theme CSS-->\n'
-                                file.writelines(convertedOutput)
-
-                                with open(templateDist / pageName, 'a', encoding='UTF-8') as file:
-                                    if page.get('css_file'):
-                                        cssFilePath = page['css_file']
-                                        cssFile = "web/bootstrap/head/"+templateName+"/css/"+cssFilePath
-
-                                        templateCssDist.mkdir(parents=True, exist_ok=True)
-                                        # TO DO:try and catch cssFile page exist before copying
-                                        shutil.copy2(cssFile, templateCssDist)
-                                        
-                                        convertedOutput += '\t<link rel="stylesheet" href="css/'+cssFilePath+'">'
-
-                                    if page.get('js_file'):
-                                        jsFilePath = page['js_file']
-                                        jsFile = "web/bootstrap/head/"+templateName+"/js/"+jsFilePath
-
-                                        templateJsDist.mkdir(parents=True, exist_ok=True)
-                                        # TO DO:try and catch jssFile page exist before copying
-                                        shutil.copy2(jsFile, templateCssDist)
-
-                                    convertedOutput += '\n</head>\n<body id="page-top">\n\t'
-
-                                    if page.get('sections'):
-                                        for section in page['sections']:
-                                            if section.get('nav'):
-                                                navFile = "web/bootstrap/main/"+templateName+"/sections/headers/"+section['nav']['file_name']+".html"
-                                                # TO DO: Put assertion in try and catch
-                                                assert os.path.exists(navFile)
-                                                with open(navFile, 'r+', encoding='UTF-8') as nav:
-                                                    for navLine in nav:
-                                                        convertedOutput += navLine
-
-                                            if section.get('div'):
-                                                for div in section['div']:
-                                                    if div['type'] == "header":
-                                                        headerFile = "web/bootstrap/main/"+templateName+"/sections/columns/"+div['file_name']+".html"
-                                                        # TO DO: Put assertion in try and catch
-                                                        assert os.path.exists(headerFile)
-                                                        with open(headerFile, 'r+', encoding='UTF-8') as div:
-                                                            for divLine in div:
-                                                                convertedOutput += divLine
-                                                    elif div['type'] == "body":
-                                                        bodyFile = "web/bootstrap/main/"+templateName+"/sections/columns/"+div['file_name']+".html"
-                                                        # TO DO: Put assertion in try and catch
-                                                        assert os.path.exists(bodyFile)
-                                                        with open(bodyFile, 'r+', encoding='UTF-8') as body:
-                                                            for body_line in body:
-                                                                convertedOutput += body_line
-                                                    elif div['type'] == "footer":
-                                                        footer_file = "web/bootstrap/main/"+templateName+"/sections/footer/"+div['file_name']+".html"
-                                                        # TO DO: Put assertion in try and catch
-                                                        assert os.path.exists(footer_file)
-                                                        with open(footer_file, 'r+', encoding='UTF-8') as footer:
-                                                            for footer_line in footer:
-                                                                convertedOutput += footer_line
-
-                                    file.writelines(convertedOutput)                                    # data = file.readlines()
-  
-                                    # print(data)
-                                    # data[1] = "Here is my modified Line 2\n"
-                                    
-                                    # with open('example.txt', 'w', encoding='utf-8') as file:
-                                    #     file.writelines(data)
-                                    # # print(line)
-                                    # if line.startswith('<!DOCTYPE html>'):
-                                    #     # print(line)
-                                    #     line = line.strip() + '2012n'
-                                    # file.write(line)
-
-                                # for line in lines:
-                                #     # line.rstrip                            
-                                #     cssComment = "<!-- Core theme CSS-->"
-                                #     if line == cssComment:
-                                #         # copy css file
-                                #         # nextLine = next(file)
-                                #         cssFile = "web/bootstrap/head/"+templateName+"/css/"+cssFilePath
-                                #         assert os.path.exists(cssFile)
-                                #         shutil.copy2(cssFile, templateCssDist)
-                                #         file.writelines('\n<link rel="stylesheet" href="css/bootstrap-v5-1-3.css">')
-                                #         # with open(cssFile, "wb") as cssDir:
-                                #         #     shutil.copy2(cssFile, templateCssDist)
-                                #             # file.write('\n<link rel="stylesheet" href="css/bootstrap-v5-1-3.css">')
-                                #         # insert CSS script
-                                #         print(line)
+                self.parse_page(page, templateName, dest)
+
+    def parse_page(self, page, templateName, dest):
+        framework = page['framework']
+        filePath = "web/"+framework+"/main/"+templateName+"/"+page['name']+".html"
+        if not os.path.exists(filePath) or not page.get('sections'):
+            return
+
+        pageName = page['name']+".html"
+        templateDist = dest / templateName
+        # Incremental builds may only need some of the pages in this spec
+        if not self.wants(templateDist / pageName):
+            return
+        self.makedirs(templateDist)
+
+        pageDependencies = []
+        if page.get('css_file'):
+            cssFilePath = page['css_file']
+            cssFile = "web/"+framework+"/head/"+templateName+"/css/"+cssFilePath
+            templateCssDist = templateDist / "css"
+            self.makedirs(templateCssDist)
+            self.install(cssFile, templateCssDist / cssFilePath, [cssFile])
+            pageDependencies.append(cssFile)
+
+        if page.get('js_file'):
+            jsFilePath = page['js_file']
+            jsFile = "web/"+framework+"/head/"+templateName+"/js/"+jsFilePath
+            templateJsDist = templateDist / "js"
+            self.makedirs(templateJsDist)
+            self.install(jsFile, templateJsDist / jsFilePath, [jsFile])
+            pageDependencies.append(jsFile)
+
+        fragments = []
+        for fragment in self.page_fragments(page, templateName):
+            pageDependencies.append(fragment)
+            fragments.append(self.fragments.read(fragment))
+
+        layout = self.layout(page, templateName)
+        pageDependencies.extend(self.layout_files(layout))
+        context = {
+            "page": page,
+            "template": templateName,
+            "framework": framework,
+            "css_file": page.get('css_file'),
+            "js_file": page.get('js_file'),
+            "fragments": fragments,
+        }
+        with self.open_output(templateDist / pageName) as file:
+            file.write(layout.render(context))
+
+        self.record(templateDist / pageName, pageDependencies)
+
+    def page_fragments(self, page, templateName):
+        sections = "web/"+page['framework']+"/main/"+templateName+"/sections/"
+        for section in page['sections']:
+            if section.get('nav'):
+                yield sections+"headers/"+section['nav']['file_name']+".html"
+
+            divs = section.get('div') or []
+            # A section with a single div may give it as an object instead of a list
+            if isinstance(divs, dict):
+                divs = [divs]
+            for div in divs:
+                folder = self.sectionFolders.get(div.get('type'))
+                if folder is not None:
+                    yield sections+folder+"/"+div['file_name']+".html"
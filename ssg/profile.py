@@ -0,0 +1,218 @@
+import os
+import sys
+import time
+import threading
+
+from pathlib import Path
+
+# The profiler of the build in progress, stages are free when this is None
+current = None
+
+
+class Span:
+    def __init__(self, profiler, name, category, args):
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        self.finish()
+        self.profiler.add(
+            self.name,
+            self.category,
+            self.wall,
+            time.perf_counter() - self.wall,
+            time.process_time() - self.cpu,
+            self.args,
+        )
+        return False
+
+    def finish(self):
+        pass
+
+
+class FileSpan(Span):
+    def __init__(self, profiler, path, parser):
+        super().__init__(profiler, str(path), "file", {"parser": type(parser).__name__})
+        self.path = path
+        self.parser = parser
+
+    def finish(self):
+        # Sizes of the inputs and outputs taken afterwards, so parsers need no
+        # instrumenting. They are not I/O: unchanged outputs that were not
+        # written and fragments served from memory are counted too.
+        inputs = size(self.path)
+        outputs = 0
+        for output, dependencies in self.parser.outputs.items():
+            inputs += sum(size(dependency) for dependency in dependencies)
+            if self.parser.output is not None and not self.parser.output.persistent:
+                outputs += len(self.parser.output.read(output) or b"")
+            else:
+                outputs += size(output)
+        self.args.update({"input_size": inputs, "output_size": outputs})
+
+
+class NullSpan:
+    @property
+    def args(self):
+        return {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL = NullSpan()
+
+
+def size(path):
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+
+def activate(profiler):
+    global current
+    previous = current
+    current = profiler
+    return previous
+
+
+def stage(name, **args):
+    if current is None:
+        return NULL
+    return Span(current, name, "stage", args)
+
+
+def render(path, parser):
+    if current is None:
+        return NULL
+    return FileSpan(current, path, parser)
+
+
+class Profiler:
+    def __init__(self):
+        self.events = []
+
+    def add(self, name, category, start, wall, cpu, args):
+        # perf_counter is a system wide monotonic clock, so worker events line up
+        self.events.append(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": wall * 1e6,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": dict(args, cpu=cpu * 1e6),
+            }
+        )
+
+    def drain(self):
+        events, self.events = self.events, []
+        return events
+
+    def stages(self):
+        totals = {}
+        for event in self.events:
+            if event["cat"] != "stage":
+                continue
+            total = totals.setdefault(event["name"], {"count": 0, "wall": 0.0, "cpu": 0.0})
+            total["count"] += 1
+            total["wall"] += event["dur"] / 1000
+            total["cpu"] += event["args"]["cpu"] / 1000
+        return totals
+
+    def parsers(self):
+        totals = {}
+        for event in self.files():
+            total = totals.setdefault(
+                event["args"]["parser"],
+                {"files": 0, "wall": 0.0, "cpu": 0.0, "input_size": 0, "output_size": 0},
+            )
+            total["files"] += 1
+            total["wall"] += event["dur"] / 1000
+            total["cpu"] += event["args"]["cpu"] / 1000
+            total["input_size"] += event["args"].get("input_size", 0)
+            total["output_size"] += event["args"].get("output_size", 0)
+        return totals
+
+    def files(self):
+        return [event for event in self.events if event["cat"] == "file"]
+
+    def slowest(self, limit=10):
+        return sorted(self.files(), key=lambda event: event["dur"], reverse=True)[:limit]
+
+    def report(self, limit=10, stream=None):
+        stream = stream or sys.stderr
+        stream.write("\x1b[1;33mStages (times include nested stages)\n")
+        stream.write("{:<14} {:>7} {:>11} {:>11}\n".format("stage", "count", "wall", "cpu"))
+        for name, total in sorted(self.stages().items(), key=lambda item: -item[1]["wall"]):
+            stream.write(
+                "{:<14} {:>7} {:>8.1f} ms {:>8.1f} ms\n".format(
+                    name, total["count"], total["wall"], total["cpu"]
+                )
+            )
+
+        stream.write("\x1b[1;33mParsers\n")
+        stream.write(
+            "{:<24} {:>7} {:>11} {:>11} {:>11} {:>11}\n".format(
+                "parser", "files", "wall", "cpu", "input size", "output size"
+            )
+        )
+        for name, total in sorted(self.parsers().items()):
+            stream.write(
+                "{:<24} {:>7} {:>8.1f} ms {:>8.1f} ms {:>8.1f} KB {:>8.1f} KB\n".format(
+                    name,
+                    total["files"],
+                    total["wall"],
+                    total["cpu"],
+                    total["input_size"] / 1024,
+                    total["output_size"] / 1024,
+                )
+            )
+
+        stream.write("\x1b[1;33mSlowest {} files\n".format(limit))
+        for event in self.slowest(limit):
+            stream.write(
+                "{:>8.1f} ms {:>8.1f} ms  {}\n".format(
+                    event["dur"] / 1000, event["args"]["cpu"] / 1000, event["name"]
+                )
+            )
+
+    def export(self, path):
+        import json
+
+        # Chrome's trace viewer reads traceEvents and ignores the summary keys
+        origin = min((event["ts"] for event in self.events), default=0)
+        events = [dict(event, ts=event["ts"] - origin) for event in self.events]
+        data = {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "stages": self.stages(),
+            "parsers": self.parsers(),
+            "slowest": [
+                {
+                    "path": event["name"],
+                    "parser": event["args"]["parser"],
+                    "wall": event["dur"] / 1000,
+                    "cpu": event["args"]["cpu"] / 1000,
+                    "input_size": event["args"].get("input_size", 0),
+                    "output_size": event["args"].get("output_size", 0),
+                }
+                for event in self.slowest()
+            ],
+        }
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(data, file, indent=1)
@@ -0,0 +1,267 @@
+import json
+import asyncio
+import mimetypes
+import posixpath
+import threading
+
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from ssg.output import MemoryOutput
+from ssg.watch import Watcher
+
+STATUS = {200: "OK", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+class DevServer:
+    events = "/__ssg/events"
+    script = (
+        "<script>new EventSource('/__ssg/events').onmessage = function (event) {"
+        " var pages = JSON.parse(event.data);"
+        " if (pages.indexOf(location.pathname) >= 0) location.reload(); };</script>"
+    )
+
+    def __init__(self, site, host="127.0.0.1", port=8000, roots=(), polling=False):
+        site.output = MemoryOutput()
+        self.site = site
+        self.store = site.output
+        self.host = host
+        self.port = port
+        self.roots = roots
+        self.polling = polling
+        self.watcher = None
+        self.stopped = threading.Event()
+        # source -> {output: dependencies} for every source rendered so far
+        self.rendered = {}
+        self.failed = set()
+        # output key -> the source that last produced it, kept after invalidation
+        self.owners = {}
+        # Suffixes of every output seen so far, and URLs known to be missing
+        self.suffixes = {".html"}
+        self.missing = set()
+        self.clients = set()
+
+    def prepare(self):
+        self.site.manifest.load()
+        for key, entry in self.site.manifest.entries.items():
+            for output in entry["outputs"]:
+                output = self.store.key(self.site.dest / output)
+                self.owners.setdefault(output, self.site.source / key)
+                self.suffixes.add(posixpath.splitext(output)[1].lower())
+        self.site.scan()
+        self.site.prepare()
+
+    def render(self, path):
+        parser = self.site.load_parser(path.suffix, path.name)
+        if parser is None:
+            self.rendered[path] = {}
+            return
+        for output in self.rendered.pop(path, {}):
+            self.store.discard(output)
+        self.failed.discard(path)
+        parser.reset()
+        try:
+            parser.parse(path, self.site.source, self.site.dest)
+        except Exception as error:
+            self.site.error("Failed to build {}: {}".format(path, error))
+            self.failed.add(path)
+            self.rendered[path] = {}
+            return
+        self.rendered[path] = dict(parser.outputs)
+        for output in parser.outputs:
+            self.owners[self.store.key(output)] = path
+            self.suffixes.add(Path(output).suffix.lower())
+
+    def candidates(self, url):
+        target = self.site.dest / posixpath.normpath(url).lstrip("/")
+        if url.endswith("/"):
+            return [target / "index.html"]
+        if target.suffix:
+            return [target]
+        return [target, target / "index.html", target.with_suffix(".html")]
+
+    def renderable(self, candidate):
+        # Pages come out as .html, copied files keep the suffix of their source
+        suffix = candidate.suffix.lower()
+        return suffix in self.suffixes or any(
+            suffix in parser.extensions for parser in self.site.parsers
+        )
+
+    def find(self, url):
+        candidates = self.candidates(url)
+        for candidate in candidates:
+            if candidate in self.store:
+                return candidate
+        if url in self.missing:
+            return None
+
+        # Render on demand, starting with whichever source built the page last
+        sources = [
+            self.owners[self.store.key(candidate)]
+            for candidate in candidates
+            if self.store.key(candidate) in self.owners
+        ]
+        # Walking renders every source not rendered yet, so only for a URL a
+        # parser could produce, and sources named like the page go first
+        renderable = [candidate for candidate in candidates if self.renderable(candidate)]
+        if renderable:
+            stems = {candidate.stem for candidate in renderable}
+            sources += sorted(
+                (
+                    path
+                    for path in self.site.walk()
+                    if path.is_file() and path not in self.rendered
+                ),
+                key=lambda path: (path.stem not in stems, path),
+            )
+        for source in sources:
+            if source in self.rendered or not source.is_file():
+                continue
+            self.render(source)
+            for candidate in candidates:
+                if candidate in self.store:
+                    return candidate
+        # Until something changes on disk
+        self.missing.add(url)
+        return None
+
+    def url(self, output):
+        url = "/" + Path(output).relative_to(self.site.dest).as_posix()
+        if url.endswith("/index.html"):
+            return [url, url[: -len("index.html")]]
+        return [url]
+
+    def invalidate(self, changed):
+        changed = {Path(path).as_posix() for path in changed}
+        self.missing.clear()
+
+        def affected(dependency):
+            return any(dependency == path or dependency.startswith(path + "/") for path in changed)
+
+        pages = set()
+        for source, outputs in list(self.rendered.items()):
+            dependencies = {source.as_posix()}
+            for graph in outputs.values():
+                dependencies.update(dependency.as_posix() for dependency in graph)
+            if source in self.failed or any(affected(dependency) for dependency in dependencies):
+                for output in outputs:
+                    self.store.discard(output)
+                    pages.update(self.url(output))
+                del self.rendered[source]
+                self.failed.discard(source)
+
+        for path in map(Path, changed):
+            parser = self.site.load_parser(path.suffix, path.name)
+            if parser is not None and parser.front_matter and path.is_file():
+                self.site.content_index.scan(path)
+        self.broadcast(sorted(pages))
+        return pages
+
+    def broadcast(self, pages):
+        if pages:
+            for queue in list(self.clients):
+                queue.put_nowait(pages)
+
+    async def handle(self, reader, writer):
+        try:
+            request = await reader.readline()
+            method, target, _ = request.decode("latin-1").split(" ", 2)
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            url = unquote(urlsplit(target).path) or "/"
+            if url == self.events:
+                await self.stream(writer)
+                return
+            if method not in ("GET", "HEAD"):
+                await self.respond(writer, 405, b"", "text/plain")
+                return
+
+            found = self.find(url)
+            body = self.store.read(found) if found is not None else None
+            if body is None:
+                await self.respond(writer, 404, b"Not Found", "text/plain")
+                return
+            kind = mimetypes.guess_type(found.name)[0] or "application/octet-stream"
+            if kind == "text/html":
+                body = self.inject(body)
+            await self.respond(writer, 200, body if method == "GET" else b"", kind, len(body))
+        except (ValueError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def inject(self, body):
+        script = self.script.encode("utf-8")
+        position = body.rfind(b"</body>")
+        if position < 0:
+            return body + script
+        return body[:position] + script + body[position:]
+
+    async def respond(self, writer, status, body, kind, length=None):
+        head = (
+            "HTTP/1.1 {} {}\r\n"
+            "Content-Type: {}\r\n"
+            "Content-Length: {}\r\n"
+            "Cache-Control: no-store\r\n"
+            "Connection: close\r\n\r\n"
+        ).format(status, STATUS[status], kind, len(body) if length is None else length)
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def stream(self, writer):
+        queue = asyncio.Queue()
+        self.clients.add(queue)
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-store\r\n\r\n"
+        )
+        try:
+            await writer.drain()
+            while True:
+                try:
+                    pages = await asyncio.wait_for(queue.get(), 15)
+                    writer.write("data: {}\n\n".format(json.dumps(pages)).encode("utf-8"))
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing the stream and notices dead clients
+                    writer.write(b": ping\n\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(queue)
+
+    def watch(self, loop):
+        while not self.stopped.is_set():
+            changed = self.watcher.changes(timeout=0.5)
+            if changed:
+                loop.call_soon_threadsafe(self.invalidate, changed)
+
+    async def start(self):
+        self.prepare()
+        server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        return server
+
+    async def serve(self):
+        server = await self.start()
+        # Rendering stays on the event loop, the watcher thread only queues changes
+        self.watcher = Watcher(self.site, self.roots, polling=self.polling)
+        thread = threading.Thread(
+            target=self.watch, args=(asyncio.get_running_loop(),), daemon=True
+        )
+        thread.start()
+        self.site.info("Serving on http://{}:{}/, press Ctrl+C to stop".format(self.host, self.port))
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.stopped.set()
+            thread.join()
+            self.watcher.backend.close()
+
+    def run(self):
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            pass
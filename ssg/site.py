@@ -1,38 +1,389 @@
-import sys
+import pickle
 
 from pathlib import Path
+from ssg.manifest import Manifest
+from ssg.assets import AssetPipeline
+from ssg.index import ContentIndex
+from ssg.cache import MetadataCache
+from ssg.output import DiskOutput, StagingArea
+from ssg.walk import Walker
+from ssg.fingerprint import Fingerprinter
+from ssg.compress import Compressor
+from ssg import log, profile
+from ssg.profile import Profiler
+
+
+class BuildError(Exception):
+    def __init__(self, errors):
+        super().__init__("{} file(s) failed to build".format(len(errors)))
+        self.errors = errors
+
+
+# Parsers are shipped to each pool worker once so their caches live for the build
+worker_parsers = {}
+
+
+def start_worker(parsers, profiling=False, threshold=log.INFO):
+    worker_parsers.update(parsers)
+    if profiling:
+        profile.activate(Profiler())
+    log.activate(log.Recorder(threshold))
+
+
+def execute(index, path, source, dest, targets=None):
+    parser = worker_parsers[index]
+    parser.reset(targets)
+    with profile.render(path, parser):
+        parser.parse(path, source, dest)
+    # Timings and log records travel back with the outputs, the parent owns the report
+    events = profile.current.drain() if profile.current is not None else []
+    return parser.outputs, events, log.current.drain()
+
+
 class Site:
-    def __init__(self, source, dest, parsers=None):
+    def __init__(
+        self,
+        source,
+        dest,
+        parsers=None,
+        incremental=False,
+        jobs=1,
+        link_mode="copy",
+        cache_dir=None,
+        output=None,
+        profiler=None,
+        atomic=False,
+        ignore=None,
+        scan_threads=1,
+        mirror_dirs=False,
+        fingerprint=False,
+        compress=False,
+    ):
         self.source = Path(source)
         self.dest = Path(dest)
         self.parsers = parsers or []
+        self.index = {}
+        self.dispatch = {}
+        self.depth = 1
+        for parser in list(self.parsers):
+            self.register(parser)
+        self.incremental = incremental
+        self.jobs = jobs
+        self.manifest = Manifest(self.source, self.dest)
+        self.assets = AssetPipeline(link_mode)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.metadata_cache = None
+        if self.cache_dir is not None:
+            self.metadata_cache = MetadataCache(self.cache_dir / "front-matter")
+        self.content_index = ContentIndex(self.source, self.dest, self.metadata_cache)
+        # Where parsers write, dest on disk unless the dev server swaps it out
+        self.output = output if output is not None else DiskOutput(self.assets)
+        self.atomic = atomic
+        # Destination directories are made when something is written to them,
+        # mirror_dirs also recreates the empty ones
+        self.walker = Walker(ignore, scan_threads, directories=mirror_dirs)
+        self.fingerprint = fingerprint
+        self.compress = compress
+        self.profiler = profiler
+        self.pool = None
+        self.pending = []
+        self.errors = []
+        self.portable = {}
 
     def create_dir(self, path):
         directory = self.dest / path.relative_to(self.source)
         directory.mkdir(parents=True, exist_ok=True)
 
-    def load_parser(self, extension):
+    def walk(self, root=None):
+        return self.walker.walk(self.source if root is None else root)
+
+    def register(self, parser, priority=None):
+        if priority is None:
+            priority = parser.priority
+        for extension in parser.extensions:
+            if not extension.startswith("."):
+                raise ValueError(
+                    "{} extension {!r} must start with a dot".format(
+                        type(parser).__name__, extension
+                    )
+                )
+            extension = extension.lower()
+            current = self.index.get(extension)
+            if current is not None and current[0] is not parser:
+                if current[1] == priority:
+                    raise ValueError(
+                        "{} and {} both claim the {} extension with priority {}, "
+                        "give one of them a higher priority".format(
+                            type(current[0]).__name__,
+                            type(parser).__name__,
+                            extension,
+                            priority,
+                        )
+                    )
+                if current[1] > priority:
+                    continue
+            self.index[extension] = (parser, priority)
+            self.depth = max(self.depth, extension.count("."))
+        if parser not in self.parsers:
+            self.parsers.append(parser)
+        self.dispatch = {}
+
+    def suffixes(self, extension, name=None):
+        if name is None or self.depth < 2:
+            return (extension.lower(),)
+        # Longest compound suffix first so .min.css wins over .css
+        parts = Path(name).suffixes[-self.depth :]
+        return tuple("".join(parts[start:]).lower() for start in range(len(parts)))
+
+    def lookup(self, suffixes):
+        for suffix in suffixes:
+            if suffix in self.index:
+                return self.index[suffix][0]
+
+    def load_parser(self, extension, name=None):
+        suffixes = self.suffixes(extension, name)
+        if suffixes not in self.dispatch:
+            self.dispatch[suffixes] = self.lookup(suffixes)
+        if self.dispatch[suffixes] is not None:
+            return self.dispatch[suffixes]
+        # Parsers may still override valid_extension with their own matching
         for parser in self.parsers:
             if parser.valid_extension(extension):
                 return parser
 
+    def picklable(self, parser):
+        if id(parser) not in self.portable:
+            try:
+                pickle.dumps(parser)
+                self.portable[id(parser)] = True
+            except Exception:
+                self.portable[id(parser)] = False
+        return self.portable[id(parser)]
+
     def run_parser(self, path):
-        parser = self.load_parser(path.suffix)
+        parser = self.load_parser(path.suffix, path.name)
         if parser is not None:
-            parser.parse(path, self.source, self.dest)
+            targets = None
+            if self.incremental:
+                targets = self.manifest.outdated(path, parser)
+                if targets is not None and not targets:
+                    log.count("skipped")
+                    return
+            if self.pool is not None and self.picklable(parser):
+                index = self.parsers.index(parser)
+                future = self.pool.submit(
+                    execute, index, path, self.source, self.dest, targets
+                )
+                self.pending.append((path, parser, targets, future))
+                return
+            try:
+                parser.reset(targets)
+                with profile.render(path, parser):
+                    parser.parse(path, self.source, self.dest)
+            except Exception as error:
+                self.fail(path, error)
+                return
+            for output in self.manifest.update(path, parser, parser.outputs, targets):
+                self.info("Removed stale output {}".format(output))
+            log.count("built")
         else:
             self.error(
                 "No parser for the {} extension, file skipped!".format(path.suffix)
             )
 
+    def fail(self, path, error):
+        self.errors.append((path, error))
+        self.manifest.discard(path)
+        log.count("failed")
+
+    def collect(self):
+        # Results are gathered in submission order so the manifest is deterministic
+        for path, parser, targets, future in self.pending:
+            try:
+                outputs, events, records = future.result()
+            except Exception as error:
+                self.fail(path, error)
+                continue
+            if self.profiler is not None:
+                self.profiler.events.extend(events)
+            log.replay(records)
+            for output in self.manifest.update(path, parser, outputs, targets):
+                self.info("Removed stale output {}".format(output))
+            log.count("built")
+        self.pending = []
+
+    def scan(self):
+        # Metadata-only first phase, so parsers can query every page while rendering
+        if not any(parser.front_matter for parser in self.parsers):
+            return
+        self.content_index.load()
+        scanned = set()
+        for path in self.walk():
+            if path.is_file():
+                parser = self.load_parser(path.suffix, path.name)
+                if parser is not None and parser.front_matter:
+                    self.content_index.scan(path)
+                    scanned.add(self.content_index.key(path))
+        self.content_index.retain(scanned)
+        if self.output.persistent:
+            self.content_index.save()
+
+    def prepare(self):
+        self.assets.reset()
+        if self.fingerprint and self.output.persistent:
+            self.output.rewriter = Fingerprinter(self.dest).restore()
+        for parser in self.parsers:
+            parser.setup(self)
+
+    def retarget(self, dest):
+        self.dest = Path(dest)
+        for store in [self.manifest, self.content_index]:
+            store.dest = self.dest
+            store.path = self.dest / store.filename
+
     def build(self):
         self.dest.mkdir(parents=True, exist_ok=True)
-        for path in self.source.rglob("*"):
-            if path.is_dir():
-                self.create_dir(path)
-            elif path.is_file():
-                self.run_parser(path)
+        staging = None
+        if self.atomic:
+            # Build into a hardlinked copy of dest, swapped in only on success
+            staging = StagingArea(self.dest)
+            self.retarget(staging.open())
+        previous = profile.activate(self.profiler)
+        log.current.start()
+        try:
+            with profile.stage("load"):
+                if self.incremental:
+                    self.manifest.load()
+            with profile.stage("scan"):
+                self.scan()
+            with profile.stage("prepare"):
+                self.prepare()
+            if self.jobs > 1:
+                from concurrent.futures import ProcessPoolExecutor
+
+                portable = {
+                    index: parser
+                    for index, parser in enumerate(self.parsers)
+                    if self.picklable(parser)
+                }
+                self.pool = ProcessPoolExecutor(
+                    max_workers=self.jobs,
+                    initializer=start_worker,
+                    initargs=(portable, self.profiler is not None, log.current.threshold),
+                )
+            try:
+                with profile.stage("render"):
+                    for path in self.walk():
+                        if path.is_dir():
+                            self.create_dir(path)
+                        elif path.is_file():
+                            self.run_parser(path)
+                with profile.stage("collect"):
+                    self.collect()
+            finally:
+                if self.pool is not None:
+                    self.pool.shutdown()
+                    self.pool = None
+            with profile.stage("save"):
+                if self.incremental:
+                    for output in self.manifest.prune():
+                        self.info("Removed stale output {}".format(output))
+                self.manifest.save()
+            with profile.stage("fingerprint"):
+                assets = self.fingerprint_assets()
+            with profile.stage("compress"):
+                self.compress_outputs(assets)
+            if staging is not None and not self.errors:
+                with profile.stage("swap"):
+                    staging.commit()
+        finally:
+            profile.activate(previous)
+            log.current.finish()
+            if staging is not None:
+                staging.abort()
+                self.retarget(staging.dest)
+
+        if self.errors:
+            for path, error in self.errors:
+                self.error("Failed to build {}: {}".format(path, error))
+            raise BuildError(self.errors)
+
+    def rebuild(self, paths):
+        # Watch mode entry point, reuses the warm parsers and caches to rebuild
+        # only the changed sources and the outputs built from changed files
+        self.manifest.signatures = {}
+        self.assets.reset()
+        retry = [path for path, _ in self.errors]
+        self.errors = []
+        sources = []
+        for path in sorted(set(map(Path, paths)) | set(retry)):
+            try:
+                key = path.relative_to(self.source).as_posix()
+            except ValueError:
+                key = None
+            if key is not None and path.is_dir():
+                if self.walker.directories:
+                    self.create_dir(path)
+                for child in sorted(self.walk(path)):
+                    if child.is_dir():
+                        self.create_dir(child)
+                    elif child.is_file():
+                        sources.append(child)
+            elif key is not None and path.is_file():
+                sources.append(path)
+            elif key is not None:
+                for output in self.manifest.remove(path):
+                    self.info("Removed stale output {}".format(output))
+                self.content_index.retain(
+                    {
+                        entry
+                        for entry in self.content_index.entries
+                        if entry != key and not entry.startswith(key + "/")
+                    }
+                )
+            for dependent in self.manifest.dependents(path):
+                sources.append(self.source / dependent)
+
+        rebuilt = []
+        for path in sources:
+            if path in rebuilt or not path.is_file():
+                continue
+            rebuilt.append(path)
+            parser = self.load_parser(path.suffix, path.name)
+            if parser is not None and parser.front_matter:
+                self.content_index.scan(path)
+            self.run_parser(path)
+        self.collect()
+        self.compress_outputs(self.fingerprint_assets())
+        if any(parser.front_matter for parser in self.parsers):
+            self.content_index.save()
+        self.manifest.save()
+
+        for path, error in self.errors:
+            self.error("Failed to build {}: {}".format(path, error))
+        return rebuilt
+
+    def fingerprint_assets(self):
+        # Only for a dest on disk, the dev server never caches
+        if self.fingerprint and self.output.persistent:
+            fingerprinter = Fingerprinter(self.dest)
+            assets = fingerprinter.run(self.manifest.outputs())
+            # Watch mode rebuilds write with the hashes just made
+            self.output.rewriter = fingerprinter
+            return assets
+        return {}
+
+    def compress_outputs(self, assets):
+        if self.compress and self.output.persistent:
+            # The hashed copies are served too, so they get sidecars as well
+            outputs = self.manifest.outputs() | set(assets.values())
+            for output in Compressor(self.dest, self.jobs if self.jobs > 1 else None).run(outputs):
+                log.debug("{name} compressed", "compressed", name=output)
+
+    @staticmethod
+    def info(message):
+        log.info(message)
 
     @staticmethod
     def error(message):
-        sys.stderr.write("\x1b[1;31m{}\n".format(message))
+        log.error(message)
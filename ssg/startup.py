@@ -0,0 +1,56 @@
+import sys
+import time
+import builtins
+
+
+class ImportTimer:
+    # Wraps __import__ so every module loaded while installed is timed, with
+    # the time spent in its own imports subtracted to get its self time
+    def __init__(self):
+        self.original = None
+        self.stack = []
+        self.timings = {}
+
+    def install(self):
+        if self.original is None:
+            self.original = builtins.__import__
+            builtins.__import__ = self.timed_import
+        return self
+
+    def uninstall(self):
+        if self.original is not None:
+            builtins.__import__ = self.original
+            self.original = None
+
+    def timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self.original(name, globals, locals, fromlist, level)
+
+        self.stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self.original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self.stack.pop()
+            if self.stack:
+                self.stack[-1] += elapsed
+            if name not in self.timings:
+                self.timings[name] = (elapsed, elapsed - children)
+
+    def total(self):
+        return sum(own for _, own in self.timings.values())
+
+    def report(self, limit=20, stream=None):
+        stream = stream or sys.stderr
+        rows = sorted(self.timings.items(), key=lambda item: item[1][0], reverse=True)
+        stream.write(
+            "\x1b[1;33mImported {} modules in {:.1f} ms\n".format(
+                len(self.timings), self.total() * 1000
+            )
+        )
+        stream.write("{:>10} {:>10}  {}\n".format("cumulative", "self", "module"))
+        for name, (cumulative, own) in rows[:limit]:
+            stream.write(
+                "{:>7.1f} ms {:>7.1f} ms  {}\n".format(cumulative * 1000, own * 1000, name)
+            )
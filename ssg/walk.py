@@ -0,0 +1,113 @@
+import os
+import fnmatch
+
+from pathlib import Path
+
+IGNORE = [".git", "node_modules", "*.swp"]
+
+
+class Entry(type(Path())):
+    # A path that remembers the file type scandir read from its directory, so
+    # is_dir and is_file cost no stat. Derived paths fall back to stat.
+    kind = None
+
+    def is_dir(self):
+        if self.kind is None:
+            return super().is_dir()
+        return self.kind == "dir"
+
+    def is_file(self):
+        if self.kind is None:
+            return super().is_file()
+        return self.kind == "file"
+
+
+def entry(path, kind):
+    result = Entry(path)
+    result.kind = kind
+    return result
+
+
+class Walker:
+    def __init__(self, ignore=None, threads=1, directories=False):
+        self.ignore = list(IGNORE if ignore is None else ignore)
+        self.threads = threads
+        self.directories = directories
+
+    def ignored(self, path, root=None):
+        name = os.path.basename(path)
+        relative = None
+        for pattern in self.ignore:
+            if "/" in pattern:
+                if relative is None:
+                    relative = Path(os.path.relpath(path, root or ".")).as_posix()
+                if fnmatch.fnmatchcase(relative, pattern):
+                    return True
+            elif fnmatch.fnmatchcase(name, pattern):
+                return True
+        return False
+
+    def entries(self, directory, root, visited):
+        # One directory, returning its files and the subdirectories to descend
+        found = []
+        subdirectories = []
+        try:
+            with os.scandir(directory) as iterator:
+                items = list(iterator)
+        except OSError:
+            return found, subdirectories
+        for item in items:
+            if self.ignored(item.path, root):
+                continue
+            try:
+                if item.is_dir():
+                    if item.is_symlink():
+                        # Followed like rglob does, but only once per real directory
+                        stat = item.stat()
+                        if (stat.st_dev, stat.st_ino) in visited:
+                            continue
+                        visited.add((stat.st_dev, stat.st_ino))
+                    if self.directories:
+                        found.append(entry(item.path, "dir"))
+                    subdirectories.append(item.path)
+                elif item.is_file():
+                    found.append(entry(item.path, "file"))
+            except OSError:
+                continue
+        return found, subdirectories
+
+    @staticmethod
+    def visit(directory):
+        try:
+            stat = os.stat(directory)
+        except OSError:
+            return set()
+        return {(stat.st_dev, stat.st_ino)}
+
+    def subtree(self, directory, root, visited=None):
+        visited = self.visit(directory) if visited is None else visited
+        pending = [directory]
+        while pending:
+            found, subdirectories = self.entries(pending.pop(), root, visited)
+            yield from found
+            # Reversed so subdirectories are walked in the order scandir listed them
+            pending.extend(reversed(subdirectories))
+
+    def walk(self, root):
+        root = os.fspath(root)
+        if self.threads <= 1:
+            yield from self.subtree(root, root)
+            return
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        # scandir releases the GIL, so top level subtrees are listed side by side
+        found, subdirectories = self.entries(root, root, self.visit(root))
+        yield from found
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            futures = [
+                pool.submit(lambda directory: list(self.subtree(directory, root)), directory)
+                for directory in subdirectories
+            ]
+            for future in futures:
+                yield from future.result()
@@ -0,0 +1,214 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+
+from pathlib import Path
+
+# Constants from sys/inotify.h
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+EVENT = struct.Struct("iIII")
+
+
+class PollingBackend:
+    # Fallback that compares (mtime, size) snapshots of every watched file
+    def __init__(self, roots, interval=0.05):
+        self.roots = [Path(root) for root in roots]
+        self.interval = interval
+        self.state = self.snapshot()
+
+    def snapshot(self):
+        state = {}
+        for root in self.roots:
+            for directory, folders, files in os.walk(root):
+                for name in folders + files:
+                    path = Path(directory) / name
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    state[path] = (stat.st_mtime_ns, stat.st_size)
+        return state
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            state = self.snapshot()
+            changed = {
+                path
+                for path in set(state) | set(self.state)
+                if state.get(path) != self.state.get(path)
+            }
+            self.state = state
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval)
+
+    def close(self):
+        pass
+
+
+class InotifyBackend:
+    mask = (
+        IN_MODIFY
+        | IN_ATTRIB
+        | IN_CLOSE_WRITE
+        | IN_MOVED_FROM
+        | IN_MOVED_TO
+        | IN_CREATE
+        | IN_DELETE
+        | IN_DELETE_SELF
+    )
+
+    def __init__(self, roots):
+        import ctypes
+        import ctypes.util
+
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self.watches = {}
+        for root in roots:
+            self.add(Path(root))
+
+    def add(self, root):
+        # inotify is not recursive, so every directory gets its own watch
+        added = []
+        for directory, _, files in os.walk(root):
+            directory = Path(directory)
+            descriptor = self.libc.inotify_add_watch(
+                self.fd, os.fsencode(directory), self.mask
+            )
+            if descriptor >= 0:
+                self.watches[descriptor] = directory
+            added.append(directory)
+            added.extend(directory / name for name in files)
+        return added
+
+    def read(self):
+        chunks = []
+        while True:
+            try:
+                chunk = os.read(self.fd, 1 << 16)
+            except OSError as error:
+                if error.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                raise
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def wait(self, timeout=None):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed = set()
+        data = self.read()
+        offset = 0
+        while offset < len(data):
+            descriptor, mask, _, length = EVENT.unpack_from(data, offset)
+            offset += EVENT.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+
+            directory = self.watches.get(descriptor)
+            if mask & IN_IGNORED:
+                self.watches.pop(descriptor, None)
+                continue
+            if directory is None:
+                continue
+            path = directory / os.fsdecode(name) if name else directory
+            changed.add(path)
+            # Files can land in a new directory before its watch exists
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                changed.update(self.add(path))
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def open_backend(roots, polling=False):
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyBackend(roots)
+        except (OSError, AttributeError):
+            pass
+    return PollingBackend(roots)
+
+
+class Watcher:
+    def __init__(self, site, roots=(), debounce=0.05, polling=False, backend=None):
+        self.site = site
+        self.roots = [site.source] + [Path(root) for root in roots if Path(root).is_dir()]
+        self.debounce = debounce
+        self.backend = backend or open_backend(self.roots, polling)
+
+    def ignored(self, path):
+        # Builds write into dest and the cache, which may sit inside a watched root
+        for directory in [self.site.dest, self.site.cache_dir]:
+            if directory is not None and (path == directory or directory in path.parents):
+                return True
+        name = path.name
+        if name.startswith(".#") or name.endswith("~"):
+            return True
+        return self.site.walker.ignored(path)
+
+    def changes(self, timeout=None):
+        changed = self.backend.wait(timeout)
+        # Editors save in bursts, so wait for a quiet period before rebuilding
+        while changed:
+            more = self.backend.wait(self.debounce)
+            if not more:
+                break
+            changed |= more
+        return {path for path in changed if not self.ignored(path)}
+
+    def poll(self, timeout=None):
+        changed = self.changes(timeout)
+        if not changed:
+            return []
+        start = time.perf_counter()
+        rebuilt = self.site.rebuild(changed)
+        self.site.info(
+            "Rebuilt {} file(s) in {:.0f} ms".format(
+                len(rebuilt), (time.perf_counter() - start) * 1000
+            )
+        )
+        return rebuilt
+
+    def run(self):
+        self.site.info(
+            "Watching {} for changes, press Ctrl+C to stop".format(
+                ", ".join(str(root) for root in self.roots)
+            )
+        )
+        try:
+            while True:
+                self.poll()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.backend.close()
@@ -0,0 +1,49 @@
+import json
+
+from ssg.parsers import LudayHtmlParser
+
+
+def make_template(root):
+    main = root / "web" / "bootstrap" / "main" / "Demo"
+    for folder in ["headers", "columns", "footer"]:
+        (main / "sections" / folder).mkdir(parents=True)
+    (main / "home.html").write_text("")
+    (main / "about.html").write_text("")
+    (main / "sections" / "headers" / "nav_1.html").write_text("<nav></nav>\n")
+    (main / "sections" / "columns" / "intro_1.html").write_text("<p>one</p>\n")
+    (main / "sections" / "columns" / "intro_2.html").write_text("<p>two</p>\n")
+    css = root / "web" / "bootstrap" / "head" / "Demo" / "css"
+    css.mkdir(parents=True)
+    (css / "site.css").write_text("body {}")
+    return main
+
+
+def make_spec(path, name, intro):
+    spec = {
+        "type": "website",
+        "template": "Demo",
+        "pages": [
+            {
+                "name": name,
+                "framework": "bootstrap",
+                "css_file": "site.css",
+                "sections": [
+                    {
+                        "nav": {"file_name": "nav_1", "type": "navigation"},
+                        "div": [{"file_name": intro, "type": "body"}],
+                    }
+                ],
+            }
+        ],
+    }
+    path.write_text(json.dumps(spec))
+
+
+class CountingParser(LudayHtmlParser):
+    def __init__(self):
+        super().__init__()
+        self.parsed = []
+
+    def parse(self, path, source, dest):
+        self.parsed.append((path.name, self.targets))
+        super().parse(path, source, dest)
@@ -0,0 +1,86 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+from ssg.assets import AssetPipeline
+
+
+@pytest.fixture
+def asset(tmp_path):
+    path = tmp_path / "demo-screen.mp4"
+    path.write_bytes(b"\x00" * 4096)
+    return path
+
+
+def test_asset_is_copied_once_per_build(tmp_path, asset):
+    pipeline = AssetPipeline()
+    target = tmp_path / "out.mp4"
+    pipeline.copy(asset, target)
+    pipeline.copy(asset, target)
+
+    assert target.read_bytes() == asset.read_bytes()
+    assert (pipeline.copied, pipeline.skipped) == (1, 1)
+
+
+def test_matching_destination_is_not_copied_again(tmp_path, asset):
+    target = tmp_path / "out.mp4"
+    AssetPipeline().copy(asset, target)
+
+    pipeline = AssetPipeline()
+    pipeline.copy(asset, target)
+    assert (pipeline.copied, pipeline.skipped) == (0, 1)
+
+    asset.write_bytes(b"\x01" * 4096)
+    pipeline.reset()
+    pipeline.copy(asset, target)
+    assert pipeline.copied == 1
+    assert target.read_bytes() == asset.read_bytes()
+
+
+def test_hardlink_mode_shares_the_inode(tmp_path, asset):
+    target = tmp_path / "out.mp4"
+    AssetPipeline("hardlink").copy(asset, target)
+    assert os.path.samefile(asset, target)
+
+
+def test_copy_mode_replaces_an_old_hardlink(tmp_path, asset):
+    target = tmp_path / "out.mp4"
+    AssetPipeline("hardlink").copy(asset, target)
+
+    asset_bytes = asset.read_bytes()
+    os.unlink(asset)
+    asset.write_bytes(b"\x02" * 10)
+    AssetPipeline("copy").copy(asset, target)
+
+    assert not os.path.samefile(asset, target)
+    assert target.read_bytes() == b"\x02" * 10
+    assert asset_bytes == b"\x00" * 4096
+
+
+def test_reflink_mode_falls_back_to_copy(tmp_path, asset):
+    target = tmp_path / "out.mp4"
+    pipeline = AssetPipeline("reflink")
+    pipeline.copy(asset, target)
+
+    assert target.read_bytes() == asset.read_bytes()
+    assert pipeline.copied + pipeline.linked == 1
+
+
+def test_unknown_link_mode_is_rejected():
+    with pytest.raises(ValueError):
+        AssetPipeline("symlink")
+
+
+def test_unknown_link_mode_is_a_usage_error(tmp_path):
+    script = os.path.join(os.path.dirname(os.path.dirname(__file__)), "ssg.py")
+    result = subprocess.run(
+        [sys.executable, script, "--link-mode", "bogus"],
+        capture_output=True,
+        text=True,
+        cwd=tmp_path,
+    )
+    assert result.returncode == 2
+    assert "Invalid value for '--link-mode'" in result.stderr
+    assert "Traceback" not in result.stderr
@@ -0,0 +1,37 @@
+import json
+
+from pathlib import Path
+
+from benchmarks.generate import SIZES, generate
+from benchmarks.run import compare, run_suite
+
+
+def test_generated_site_builds(tmp_path):
+    generate(tmp_path, **SIZES["tiny"])
+    assert len(list((tmp_path / "content" / "specs").glob("*.json"))) == 2
+    assert (tmp_path / "content" / "assets" / "blob_0.png").stat().st_size == 4096
+
+    data = run_suite(tmp_path, repeat=1, scenarios=["cold_build", "single_file_rebuild"])
+    assert set(data["results"]) == {"cold_build", "single_file_rebuild"}
+    assert all(result["runs"][0] > 0 for result in data["results"].values())
+    json.dumps(data)
+
+    dist = tmp_path / "dist"
+    assert (dist / "post_0.html").exists()
+    assert (dist / "doc_1.html").exists()
+    assert (dist / "Bench" / "site_1_page_1.html").exists()
+    assert (dist / "assets" / "blob_0.png").exists()
+    assert Path.cwd() != tmp_path
+
+
+def test_compare_flags_slowdowns_beyond_the_threshold():
+    baseline = {"results": {"cold": {"median": 1.0}, "noop": {"median": 0.1}}}
+    current = {
+        "results": {
+            "cold": {"median": 1.05},
+            "noop": {"median": 0.2},
+            "new": {"median": 5.0},
+        }
+    }
+    assert compare(baseline, current, threshold=0.1) == [("noop", 0.1, 0.2, 2.0)]
+    assert compare(baseline, current, threshold=1.5) == []
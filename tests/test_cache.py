@@ -0,0 +1,73 @@
+import os
+
+import pytest
+import yaml
+
+from ssg.cache import FragmentCache, MetadataCache
+from ssg.content import Content
+
+
+def test_fragment_is_read_once(tmp_path):
+    fragment = tmp_path / "nav.html"
+    fragment.write_text("<nav></nav>\n")
+    cache = FragmentCache()
+
+    for _ in range(5):
+        assert cache.read(fragment) == "<nav></nav>\n"
+    assert (cache.hits, cache.misses) == (4, 1)
+
+
+def test_fragment_is_reloaded_when_modified(tmp_path):
+    fragment = tmp_path / "nav.html"
+    fragment.write_text("old")
+    cache = FragmentCache()
+    cache.read(fragment)
+
+    fragment.write_text("newer")
+    stat = fragment.stat()
+    os.utime(fragment, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert cache.read(fragment) == "newer"
+    assert len(cache) == 1
+
+
+def test_least_recently_used_fragment_is_evicted(tmp_path):
+    for name in "abc":
+        (tmp_path / name).write_text(name * 10)
+    cache = FragmentCache(limit=25)
+
+    cache.read(tmp_path / "a")
+    cache.read(tmp_path / "b")
+    cache.read(tmp_path / "a")
+    cache.read(tmp_path / "c")
+
+    cached = {os.path.basename(key[0]) for key in cache.entries}
+    assert cached == {"a", "c"}
+    assert cache.size <= 25
+
+
+def test_metadata_cache_parses_each_front_matter_once(tmp_path, monkeypatch):
+    calls = []
+    original = yaml.load
+
+    def counting_load(fm, Loader):
+        calls.append(fm)
+        return original(fm, Loader=Loader)
+
+    monkeypatch.setattr(yaml, "load", counting_load)
+    cache = MetadataCache(tmp_path / "front-matter")
+    first = Content.load("---\ntitle: One\n---\nbody", cache)
+    first.data["title"] = "changed"
+    second = Content.load("---\ntitle: One\n---\nother body", cache)
+
+    assert second["title"] == "One"
+    assert len(calls) == 1
+
+    fresh = MetadataCache(tmp_path / "front-matter")
+    assert Content.load("---\ntitle: One\n---\n", fresh)["title"] == "One"
+    assert len(calls) == 1
+    assert fresh.hits == 1
+
+
+def test_front_matter_uses_a_safe_loader():
+    with pytest.raises(yaml.YAMLError):
+        Content.load("---\ntitle: !!python/tuple [1, 2]\n---\nbody")
@@ -0,0 +1,82 @@
+import os
+import gzip
+import json
+
+import ssg.compress
+
+from ssg.site import Site
+from ssg.compress import Compressor
+from ssg.parsers import MarkdownParser, ResourceParser
+
+
+def make_site(tmp_path, **options):
+    parsers = [ResourceParser(), MarkdownParser()]
+    return Site(tmp_path / "content", tmp_path / "dist", parsers, incremental=True, compress=True, **options)
+
+
+def test_text_outputs_get_gzip_sidecars(tmp_path, capsys):
+    source = tmp_path / "content"
+    source.mkdir()
+    (source / "post.md").write_text("---\ntitle: Post\n---\n" + "Some text. " * 50)
+    (source / "style.css").write_text("h1 { color: red; }\n" * 20)
+    (source / "logo.png").write_bytes(b"\x89PNG" * 100)
+    make_site(tmp_path, jobs=2).build()
+
+    dest = tmp_path / "dist"
+    for name in ["post.html", "style.css"]:
+        with gzip.open(dest / (name + ".gz")) as file:
+            assert file.read() == (dest / name).read_bytes()
+        assert os.stat(dest / (name + ".gz")).st_mtime_ns == os.stat(dest / name).st_mtime_ns
+    assert not (dest / "logo.png.gz").exists()
+    manifest = json.loads((dest / "compress-manifest.json").read_text())
+    assert sorted(manifest["files"]) == ["post.html", "style.css"]
+
+
+def test_sidecars_are_only_written_when_the_content_changes(tmp_path, monkeypatch):
+    dest = tmp_path / "dist"
+    dest.mkdir()
+    (dest / "page.html").write_text("<p>page</p>" * 20)
+    (dest / "tiny.txt").write_text("a")
+    (dest / "old.html").write_text("<p>old</p>" * 20)
+    assert Compressor(dest, 1).run(["page.html", "tiny.txt", "old.html"]) == ["old.html", "page.html", "tiny.txt"]
+    # Gzip would make a one byte file bigger
+    assert not (dest / "tiny.txt.gz").exists()
+
+    calls = []
+    encode = ssg.compress.encode
+    monkeypatch.setattr(ssg.compress, "encode", lambda suffix, data: calls.append(suffix) or encode(suffix, data))
+
+    # Same bytes rewritten, the digest matches so nothing is compressed
+    (dest / "page.html").write_text("<p>page</p>" * 20)
+    os.utime(dest / "page.html", ns=(1, 1))
+    assert Compressor(dest, 1).run(["page.html", "tiny.txt"]) == []
+    assert calls == []
+    # Sidecars of outputs that are gone are removed with them
+    assert not (dest / "old.html.gz").exists()
+
+    (dest / "page.html").write_text("<p>changed</p>" * 20)
+    assert Compressor(dest, 1).run(["page.html", "tiny.txt"]) == ["page.html"]
+    assert calls == [".gz"]
+    assert gzip.decompress((dest / "page.html.gz").read_bytes()) == (dest / "page.html").read_bytes()
+
+    (dest / "page.html.gz").unlink()
+    assert Compressor(dest, 1).run(["page.html", "tiny.txt"]) == ["page.html"]
+    assert (dest / "page.html.gz").exists()
+
+
+def test_brotli_sidecars_follow_the_module(tmp_path, monkeypatch):
+    dest = tmp_path / "dist"
+    dest.mkdir()
+    (dest / "page.html").write_text("<p>page</p>" * 20)
+    monkeypatch.setattr(ssg.compress, "available", lambda: [".gz", ".br"])
+    monkeypatch.setattr(
+        ssg.compress, "encode", lambda suffix, data: suffix.encode() if suffix == ".br" else gzip.compress(data)
+    )
+    assert Compressor(dest, 1).run(["page.html"]) == ["page.html"]
+    assert (dest / "page.html.br").read_bytes() == b".br"
+
+    # Without brotli the old .br files are dropped rather than left stale
+    monkeypatch.setattr(ssg.compress, "available", lambda: [".gz"])
+    assert Compressor(dest, 1).run(["page.html"]) == ["page.html"]
+    assert not (dest / "page.html.br").exists()
+    assert (dest / "page.html.gz").exists()
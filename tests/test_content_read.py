@@ -0,0 +1,61 @@
+import pytest
+
+from pathlib import Path
+
+from ssg.content import Body, Content
+
+SAMPLES = [
+    "---\ntype: post\ntitle: One\n---\n# Heading\n",
+    "---\ntitle: Blank lines\n---\n\n\n# Heading\n\ntext\n",
+    "+++\ntitle: Toml style\n+++   \n  indented\n",
+    "---\ntitle: Empty body\n---\n",
+    "---\ntitle: Only whitespace\n---\n\n   \n",
+    "---\ntitle: Unicode\n---\n# Café ☕\n",
+]
+
+
+@pytest.mark.parametrize("sample", SAMPLES)
+def test_read_matches_load(tmp_path, sample):
+    path = tmp_path / "page.md"
+    path.write_text(sample, encoding="utf-8")
+
+    expected = Content.load(sample)
+    content = Content.read(path)
+    assert repr(content) == repr(expected)
+    assert content.body == expected.body
+
+
+@pytest.mark.parametrize("name", ["index.md", "post.md", "contact.rst"])
+def test_read_matches_load_for_bundled_content(name):
+    path = Path(__file__).parent.parent / "content" / name
+    expected = Content.load(path.read_text(encoding="utf-8"))
+    assert Content.read(path).body == expected.body
+
+
+def test_body_is_loaded_lazily(tmp_path):
+    path = tmp_path / "page.md"
+    path.write_text("---\ntitle: Lazy\n---\nbody\n")
+
+    content = Content.read(path)
+    assert isinstance(content.handle, Body)
+    assert content["title"] == "Lazy"
+    assert content.body == "\nbody\n"
+    assert content.handle == "\nbody\n"
+
+
+def test_front_matter_is_required(tmp_path):
+    path = tmp_path / "page.md"
+    path.write_text("no front matter here\n")
+    with pytest.raises(ValueError):
+        Content.read(path)
+
+
+def test_content_is_compact():
+    first = Content.load("---\ntitle: One\ntype: post\n---\nbody")
+    second = Content.load("---\ntitle: Two\ntype: post\n---\nbody")
+    assert not hasattr(first, "__dict__")
+    assert list(first) == ["title", "type"]
+    assert dict(first) == {"title": "One", "type": "post"}
+    assert len(first) == 2
+    assert repr(first) == "{'title': 'One', 'type': 'post'}"
+    assert [a is b for a, b in zip(first, second)] == [True, True]
@@ -0,0 +1,73 @@
+import json
+
+from pathlib import Path
+
+from ssg.site import Site
+from ssg.parsers import LudayHtmlParser
+from tests.luday import CountingParser, make_spec, make_template
+
+
+def build(parser):
+    Site("content", "dist", [parser], incremental=True).build()
+    return parser.parsed
+
+
+def test_fragment_change_rebuilds_only_dependent_pages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    main = make_template(tmp_path)
+    (tmp_path / "content").mkdir()
+    make_spec(tmp_path / "content" / "home.json", "home", "intro_1")
+    make_spec(tmp_path / "content" / "about.json", "about", "intro_2")
+
+    assert len(build(CountingParser())) == 2
+    assert build(CountingParser()) == []
+
+    (main / "sections" / "columns" / "intro_1.html").write_text("<p>uno</p>\n")
+    parsed = build(CountingParser())
+    assert [name for name, _ in parsed] == ["home.json"]
+    assert parsed[0][1] == {Path("dist") / "Demo" / "home.html"}
+    assert "uno" in (tmp_path / "dist" / "Demo" / "home.html").read_text()
+
+
+def test_manifest_records_dependents(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    make_template(tmp_path)
+    (tmp_path / "content").mkdir()
+    make_spec(tmp_path / "content" / "home.json", "home", "intro_1")
+
+    site = Site("content", "dist", [LudayHtmlParser()], incremental=True)
+    site.build()
+
+    fragment = "web/bootstrap/main/Demo/sections/columns/intro_1.html"
+    assert site.manifest.dependents(fragment) == {"home.json": ["Demo/home.html"]}
+    css = "web/bootstrap/head/Demo/css/site.css"
+    assert site.manifest.dependents(css) == {
+        "home.json": ["Demo/css/site.css", "Demo/home.html"]
+    }
+
+
+def test_page_removed_from_a_spec_loses_its_output(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    make_template(tmp_path)
+    (tmp_path / "content").mkdir()
+    spec = tmp_path / "content" / "s.json"
+    make_spec(spec, "home", "intro_1")
+    data = json.loads(spec.read_text())
+    about = dict(data["pages"][0], name="about")
+    data["pages"].append(about)
+    spec.write_text(json.dumps(data))
+    make_spec(tmp_path / "content" / "t.json", "other", "intro_2")
+
+    build(CountingParser())
+    about_html = tmp_path / "dist" / "Demo" / "about.html"
+    assert about_html.exists()
+
+    data["pages"].remove(about)
+    spec.write_text(json.dumps(data))
+    site = Site("content", "dist", [LudayHtmlParser()], incremental=True)
+    site.build()
+    assert not about_html.exists()
+    assert sorted(site.manifest.entries["s.json"]["outputs"]) == ["Demo/css/site.css", "Demo/home.html"]
+    # The stylesheet is still claimed by both specs
+    assert (tmp_path / "dist" / "Demo" / "css" / "site.css").exists()
+    assert "Removed stale output dist/Demo/about.html" in capsys.readouterr().out
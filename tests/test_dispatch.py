@@ -0,0 +1,69 @@
+import pytest
+
+from ssg.site import Site
+from ssg.parsers import Parser, ResourceParser, MarkdownParser
+
+
+class MinifiedParser(Parser):
+    extensions = [".min.css"]
+
+
+class ArchiveParser(Parser):
+    extensions = [".tar.gz"]
+
+
+class OverrideParser(ResourceParser):
+    priority = 10
+
+
+class PrefixParser(Parser):
+    def valid_extension(self, extension):
+        return extension.startswith(".j2")
+
+
+def test_dispatch_is_case_insensitive():
+    resource = ResourceParser()
+    site = Site("content", "dist", [resource, MarkdownParser()])
+    assert site.load_parser(".PNG", "logo.PNG") is resource
+    assert site.load_parser(".css") is resource
+
+
+def test_compound_suffix_wins_over_single_suffix():
+    resource, minified, archive = ResourceParser(), MinifiedParser(), ArchiveParser()
+    site = Site("content", "dist", [resource, minified, archive])
+
+    assert site.load_parser(".css", "app.min.css") is minified
+    assert site.load_parser(".css", "app.css") is resource
+    assert site.load_parser(".gz", "site-1.0.tar.gz") is archive
+    assert site.load_parser(".gz", "notes.gz") is None
+
+
+def test_conflicting_extensions_need_a_priority():
+    with pytest.raises(ValueError) as error:
+        Site("content", "dist", [ResourceParser(), ResourceParser()])
+    assert "both claim the .jpg extension" in str(error.value)
+
+    override = OverrideParser()
+    site = Site("content", "dist", [ResourceParser(), override])
+    assert site.load_parser(".png") is override
+
+    site = Site("content", "dist", [ResourceParser()])
+    markdown = MarkdownParser()
+    site.register(markdown, priority=5)
+    assert site.load_parser(".md", "post.md") is markdown
+    assert markdown in site.parsers
+
+
+def test_custom_valid_extension_is_still_honoured():
+    prefix = PrefixParser()
+    site = Site("content", "dist", [prefix])
+    assert site.load_parser(".j2html", "page.j2html") is prefix
+    assert site.load_parser(".txt", "notes.txt") is None
+
+
+def test_extensions_must_start_with_a_dot():
+    class Undotted(Parser):
+        extensions = ["md"]
+
+    with pytest.raises(ValueError):
+        Site("content", "dist", [Undotted()])
@@ -0,0 +1,83 @@
+import os
+import json
+
+from ssg.site import Site
+from ssg.parsers import LudayHtmlParser, MarkdownParser, ResourceParser
+from tests.luday import make_spec, make_template
+
+
+def read_manifest(dest):
+    with open(dest / "assets-manifest.json") as file:
+        return {key: entry["hashed"] for key, entry in json.load(file)["assets"].items()}
+
+
+def test_luday_stylesheets_are_fingerprinted(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    make_template(tmp_path)
+    (tmp_path / "content").mkdir()
+    make_spec(tmp_path / "content" / "home.json", "home", "intro_1")
+    Site("content", "dist", [LudayHtmlParser()], incremental=True, fingerprint=True).build()
+
+    dest = tmp_path / "dist"
+    hashed = read_manifest(dest)["Demo/css/site.css"]
+    assert hashed.startswith("Demo/css/site.") and len(hashed) == len("Demo/css/site.css") + 9
+    assert (dest / hashed).read_text() == "body {}"
+    home = (dest / "Demo" / "home.html").read_text()
+    assert '<link rel="stylesheet" href="css/{}">'.format(hashed.split("/")[-1]) in home
+
+    # Pages are written already pointing at the hashes, so an identical build
+    # leaves them alone
+    before = os.stat(dest / "Demo" / "home.html")
+    site = Site("content", "dist", [LudayHtmlParser()], fingerprint=True)
+    site.build()
+    assert (site.output.written, site.output.unchanged) == (0, 1)
+    assert os.stat(dest / "Demo" / "home.html").st_ino == before.st_ino
+    assert (dest / "Demo" / "home.html").read_text() == home
+
+    (tmp_path / "web" / "bootstrap" / "head" / "Demo" / "css" / "site.css").write_text("p {}")
+    Site("content", "dist", [LudayHtmlParser()], incremental=True, fingerprint=True).build()
+    updated = read_manifest(dest)["Demo/css/site.css"]
+    assert updated != hashed
+    assert not (dest / hashed).exists()
+    assert updated.split("/")[-1] in (dest / "Demo" / "home.html").read_text()
+
+
+def make_site(tmp_path):
+    parsers = [ResourceParser(), MarkdownParser()]
+    return Site(tmp_path / "content", tmp_path / "dist", parsers, incremental=True, fingerprint=True)
+
+
+def test_pages_and_stylesheets_point_at_hashed_assets(tmp_path, capsys):
+    source = tmp_path / "content"
+    (source / "img").mkdir(parents=True)
+    (source / "img" / "logo.png").write_bytes(b"\x89PNG logo")
+    (source / "style.css").write_text("h1 { background: url('img/logo.png'); }")
+    (source / "post.md").write_text(
+        "---\ntitle: Post\n---\n![logo](img/logo.png) [home](https://example.com/img/logo.png)\n"
+    )
+    make_site(tmp_path).build()
+    dest = tmp_path / "dist"
+    manifest = read_manifest(dest)
+    logo = manifest["img/logo.png"]
+    assert os.path.samefile(dest / logo, dest / "img" / "logo.png")
+
+    post = (dest / "post.html").read_text()
+    assert 'src="{}"'.format(logo) in post
+    assert 'href="https://example.com/img/logo.png"' in post
+    assert (dest / manifest["style.css"]).read_text() == "h1 {{ background: url('{}'); }}".format(logo)
+    assert (dest / "style.css").read_text() == "h1 { background: url('img/logo.png'); }"
+
+    # Nothing changed, so the pages are left alone
+    before = os.stat(dest / "post.html").st_mtime_ns
+    make_site(tmp_path).build()
+    assert read_manifest(dest) == manifest
+    assert os.stat(dest / "post.html").st_mtime_ns == before
+
+    (tmp_path / "content" / "img" / "logo.png").write_bytes(b"\x89PNG new logo")
+    make_site(tmp_path).build()
+    updated = read_manifest(dest)
+    assert updated["img/logo.png"] != logo
+    assert updated["style.css"] != manifest["style.css"]
+    assert 'src="{}"'.format(updated["img/logo.png"]) in (dest / "post.html").read_text()
+    assert not (dest / logo).exists()
+    assert not (dest / manifest["style.css"]).exists()
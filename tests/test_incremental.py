@@ -0,0 +1,78 @@
+import os
+
+from ssg.site import Site
+from ssg.parsers import ResourceParser
+
+
+class CountingParser(ResourceParser):
+    def __init__(self):
+        super().__init__()
+        self.parsed = []
+
+    def parse(self, path, source, dest):
+        self.parsed.append(path.name)
+        super().parse(path, source, dest)
+
+
+def make_site(tmp_path, parser):
+    return Site(tmp_path / "content", tmp_path / "dist", [parser], incremental=True)
+
+
+def test_incremental_skips_unchanged_files(tmp_path):
+    source = tmp_path / "content"
+    source.mkdir()
+    (source / "a.css").write_text("a {}")
+    (source / "b.css").write_text("b {}")
+
+    parser = CountingParser()
+    make_site(tmp_path, parser).build()
+    assert sorted(parser.parsed) == ["a.css", "b.css"]
+
+    parser = CountingParser()
+    make_site(tmp_path, parser).build()
+    assert parser.parsed == []
+
+    (source / "a.css").write_text("a { color: red }")
+    parser = CountingParser()
+    make_site(tmp_path, parser).build()
+    assert parser.parsed == ["a.css"]
+
+
+def test_incremental_touch_without_change_is_fresh(tmp_path):
+    source = tmp_path / "content"
+    source.mkdir()
+    css = source / "a.css"
+    css.write_text("a {}")
+    make_site(tmp_path, CountingParser()).build()
+
+    stat = css.stat()
+    os.utime(css, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    parser = CountingParser()
+    make_site(tmp_path, parser).build()
+    assert parser.parsed == []
+
+
+def test_incremental_removes_outputs_of_deleted_sources(tmp_path):
+    source = tmp_path / "content"
+    source.mkdir()
+    (source / "a.css").write_text("a {}")
+    (source / "b.css").write_text("b {}")
+    make_site(tmp_path, CountingParser()).build()
+    assert (tmp_path / "dist" / "b.css").exists()
+
+    (source / "b.css").unlink()
+    make_site(tmp_path, CountingParser()).build()
+    assert not (tmp_path / "dist" / "b.css").exists()
+    assert (tmp_path / "dist" / "a.css").exists()
+
+
+def test_incremental_rebuilds_missing_outputs(tmp_path):
+    source = tmp_path / "content"
+    source.mkdir()
+    (source / "a.css").write_text("a {}")
+    make_site(tmp_path, CountingParser()).build()
+
+    (tmp_path / "dist" / "a.css").unlink()
+    parser = CountingParser()
+    make_site(tmp_path, parser).build()
+    assert parser.parsed == ["a.css"]
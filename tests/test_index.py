@@ -0,0 +1,67 @@
+import datetime
+
+from ssg.site import Site
+from ssg.index import ContentIndex
+from ssg.parsers import Parser
+
+
+class MetadataParser(Parser):
+    extensions = [".md"]
+    front_matter = True
+
+    def parse(self, path, source, dest):
+        pass
+
+
+def write_page(path, **metadata):
+    lines = ["{}: {}".format(key, value) for key, value in metadata.items()]
+    path.write_text("---\n{}\n---\nbody\n".format("\n".join(lines)))
+
+
+def make_site(tmp_path):
+    source = tmp_path / "content"
+    source.mkdir(exist_ok=True)
+    write_page(source / "old.md", type="post", date="2019-05-01", tags="[python, ssg]")
+    write_page(source / "new.md", type="post", date="01-28-2020", tags="python")
+    write_page(source / "about.md", type="page", title="About")
+    return Site(source, tmp_path / "dist", [MetadataParser()])
+
+
+def test_scan_builds_queryable_index(tmp_path):
+    site = make_site(tmp_path)
+    site.build()
+    index = site.content_index
+
+    posts = index.query(type="post", order="date", reverse=True)
+    assert [key for key, _ in posts] == ["new.md", "old.md"]
+    assert [key for key, _ in index.query(tag="ssg")] == ["old.md"]
+    assert index.get("about.md")["title"] == "About"
+    assert index.get("old.md")["date"] == "2019-05-01"
+    assert site.parsers[0].content_index is index
+
+
+def test_index_is_persisted_and_reused(tmp_path, monkeypatch):
+    make_site(tmp_path).build()
+
+    def fail(path):
+        raise AssertionError("{} was re-read".format(path))
+
+    monkeypatch.setattr("ssg.index.Content.read", fail)
+    site = Site(tmp_path / "content", tmp_path / "dist", [MetadataParser()])
+    site.build()
+    assert len(site.content_index) == 3
+
+
+def test_deleted_pages_leave_the_index(tmp_path):
+    make_site(tmp_path).build()
+    (tmp_path / "content" / "old.md").unlink()
+
+    site = Site(tmp_path / "content", tmp_path / "dist", [MetadataParser()])
+    site.build()
+    assert "old.md" not in site.content_index
+    assert site.content_index.query(tag="ssg") == []
+
+
+def test_dates_are_normalized():
+    assert ContentIndex.normalize(datetime.date(2020, 1, 28)) == "2020-01-28"
+    assert ContentIndex.sort_date("01-28-2020") == ContentIndex.sort_date("2020-01-28")
@@ -0,0 +1,95 @@
+import io
+import json
+
+from ssg import log
+from ssg.site import Site
+from ssg.parsers import MarkdownParser
+
+
+class Unformattable:
+    def __format__(self, spec):
+        raise AssertionError("formatted")
+
+
+def make_logger(monkeypatch, level=log.INFO, **options):
+    stream = io.StringIO()
+    errors = io.StringIO()
+    logger = log.Logger(level, stream=stream, errors=errors, **options)
+    monkeypatch.setattr(log, "current", logger)
+    return logger, stream, errors
+
+
+def test_records_below_the_level_are_never_formatted(monkeypatch):
+    logger, stream, errors = make_logger(monkeypatch)
+    log.debug("{value}", value=Unformattable())
+    log.info("plain {braces} kept")
+    log.error("{count} failed", count=2)
+    assert stream.getvalue() == "plain {braces} kept\n"
+    assert errors.getvalue() == "2 failed\n"
+
+
+def test_quiet_keeps_warnings_and_errors(monkeypatch):
+    logger, stream, errors = make_logger(monkeypatch, log.WARNING)
+    log.info("hidden")
+    log.warning("shown")
+    log.error("also shown")
+    logger.start()
+    logger.finish()
+    assert stream.getvalue() == "shown\n"
+    assert errors.getvalue() == "also shown\n"
+
+
+def test_lines_are_batched_during_a_build(monkeypatch):
+    logger, stream, errors = make_logger(monkeypatch, log.DEBUG, batch=3)
+    logger.start()
+    log.debug("one")
+    log.debug("two")
+    assert stream.getvalue() == ""
+    log.debug("three")
+    assert stream.getvalue() == "one\ntwo\nthree\n"
+    log.debug("four")
+    log.error("broken")
+    assert stream.getvalue().endswith("four\n")
+    assert errors.getvalue() == "broken\n"
+
+    log.count("built")
+    log.count("built")
+    log.count("failed")
+    logger.finish()
+    assert stream.getvalue().splitlines()[-1].startswith(
+        "Built 2 file(s), 0 up to date, 1 failed in "
+    )
+
+
+def test_json_log_keeps_every_record(monkeypatch, tmp_path):
+    path = tmp_path / "build.jsonl"
+    logger, stream, errors = make_logger(monkeypatch, log.WARNING, json_path=path)
+    log.debug("{name} done", "converted", name="post.md", metadata={"title": "Post"})
+    log.error("failed")
+    logger.close()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record["level"] for record in records] == ["debug", "error"]
+    assert records[0]["event"] == "converted"
+    assert records[0]["message"] == "post.md done"
+    assert records[0]["metadata"] == {"title": "Post"}
+    assert stream.getvalue() == ""
+
+
+def test_worker_records_are_replayed(monkeypatch, tmp_path):
+    path = tmp_path / "build.jsonl"
+    logger, stream, errors = make_logger(monkeypatch, json_path=path)
+    source = tmp_path / "content"
+    source.mkdir()
+    for name in ["one", "two", "three"]:
+        (source / (name + ".md")).write_text("---\ntitle: {}\n---\n# {}\n".format(name, name))
+
+    Site(source, tmp_path / "dist", [MarkdownParser()], jobs=2).build()
+    logger.close()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    converted = sorted(record["name"] for record in records if record["event"] == "converted")
+    assert converted == ["one.md", "three.md", "two.md"]
+    assert records[-1]["event"] == "summary"
+    assert records[-1]["built"] == 3
+    assert "converted" not in stream.getvalue()
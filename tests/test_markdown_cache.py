@@ -0,0 +1,68 @@
+from pathlib import Path
+
+from markdown import markdown
+
+from ssg.site import Site
+from ssg.parsers import MarkdownParser
+
+CONTENT = Path(__file__).parent.parent / "content"
+
+
+def build(tmp_path, parser):
+    source = tmp_path / "content"
+    source.mkdir(exist_ok=True)
+    (source / "post.md").write_text((CONTENT / "post.md").read_text())
+    (source / "index.md").write_text((CONTENT / "index.md").read_text())
+    Site(source, tmp_path / "dist", [parser], cache_dir=tmp_path / "cache").build()
+    return parser
+
+
+def test_cached_render_matches_markdown(tmp_path, capsys):
+    parser = build(tmp_path, MarkdownParser())
+    assert parser.render_cache.misses == 2
+
+    source = (tmp_path / "content" / "post.md").read_text()
+    body = source.split("---", 2)[2]
+    assert (tmp_path / "dist" / "post.html").read_text() == markdown(body)
+
+    parser = build(tmp_path, MarkdownParser())
+    assert (parser.render_cache.hits, parser.render_cache.misses) == (2, 0)
+    assert (tmp_path / "dist" / "post.html").read_text() == markdown(body)
+
+
+def test_extension_config_is_part_of_the_key(tmp_path, capsys):
+    build(tmp_path, MarkdownParser())
+    parser = build(tmp_path, MarkdownParser(markdown_extensions=["fenced_code"]))
+    assert parser.render_cache.misses == 2
+    assert "<code class" in (tmp_path / "dist" / "post.html").read_text()
+
+
+def test_render_cache_is_size_bounded(tmp_path):
+    parser = MarkdownParser()
+    site = Site(tmp_path, tmp_path / "dist", [parser], cache_dir=tmp_path / "cache")
+    parser.setup(site)
+    parser.render_cache.limit = 2000
+
+    for number in range(20):
+        parser.markdown("paragraph {} ".format(number) * 20)
+    assert parser.render_cache.trim() <= 2000
+
+
+def test_render_cache_memory_is_bounded(tmp_path):
+    parser = MarkdownParser()
+    site = Site(tmp_path, tmp_path / "dist", [parser], cache_dir=tmp_path / "cache")
+    parser.setup(site)
+    cache = parser.render_cache
+    cache.memory_limit = 1000
+
+    first = "paragraph 0 " * 20
+    parser.markdown(first)
+    for number in range(1, 20):
+        parser.markdown("paragraph {} ".format(number) * 20)
+    assert 0 < cache.memory_size <= 1000
+    assert cache.memory_size == sum(len(data) for data in cache.memory.values())
+
+    # Evicted renders are still read back from disk
+    hits = cache.hits
+    assert parser.markdown(first) == markdown(first)
+    assert cache.hits == hits + 1
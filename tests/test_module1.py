@@ -202,7 +202,7 @@ def test_site_build_function_module1(parse):
 @pytest.mark.test_site_path_rglob_module1
 def test_site_path_rglob_module1(parse):
 
-    # for path in self.source.rglob("*"):
+    # for path in self.walk():
     #     if path.is_dir():
     #         self.create_dir(path)
 
@@ -223,11 +223,11 @@ def test_site_path_rglob_module1(parse):
     assert for_loop_exists, "Have you created a for loop in the `build` method?"
 
     for_loop_target_exists = (
-        str(for_loop.target).replace("'", '"') == 'self.source.rglob("*")'
+        str(for_loop.target).replace("'", '"') == "self.walk()"
     )
     assert (
         for_loop_target_exists
-    ), "Have you created a for loop in the `build` method? That loops through `self.source` with the `rglob` method?"
+    ), "Have you created a for loop in the `build` method? That loops through `self.source` with the `walk` method?"
 
     for_loop_iterator_exists = for_loop.iterator.value == "path"
     assert (
@@ -14,8 +14,8 @@ def test_parser_imports_module4(parse):
     parsers = parse("parsers")
     assert parsers.success, parsers.message
 
-    sys_import = "sys" in parsers.get_imports()
-    assert sys_import, "Are you importing `sys`?"
+    log_import = "log" in parsers.get_from_import("ssg")
+    assert log_import, "Are you importing `log` from `ssg`?"
 
     docutils_import = "publish_parts" in parsers.get_from_import("docutils.core")
     assert docutils_import, "Are you importing `publish_parts` from `docutils.core`?"
@@ -124,7 +124,12 @@ def test_parser_markdown_parse_module4(parse):
 def test_parser_markdown_parse_write_html_module4(parse):
     # html = markdown(content.body)
     # self.write(path, dest, html)
-    # sys.stdout.write("\x1b[1;32m{} converted to HTML. Metadata: {}\n".format(path.name, content))
+    # log.debug(
+    #     "{name} converted to HTML. Metadata: {metadata}",
+    #     "converted",
+    #     name=path.name,
+    #     metadata=content.data,
+    # )
 
     parsers = parse("parsers")
     assert parsers.success, parsers.message
@@ -177,27 +182,20 @@ def test_parser_markdown_parse_write_html_module4(parse):
         args_correct
     ), "Are you passing the correct number of arguments to `self.write()`?"
 
-    stdout_write_call = parse.code.find(
+    log_call = parse.code.find(
         "atomtrailers",
-        lambda node: len(node) == 4
-        and node[0].name.value == "sys"
-        and node[1].name.value == "stdout"
-        and node[2].name.value == "write",
-    )
-
-    stdout_write_args = list(
-        stdout_write_call.call_argument.find_all(["name", "string", "binary_operator"]).map(
-            lambda node: str(node.value).replace("'", '"')
-        )
+        lambda node: len(node) == 3
+        and node[0].name.value == "log"
+        and node[1].name.value == "debug",
     )
-    write_message = stdout_write_args == [
-        '"\\x1b[1;32m{} converted to HTML. Metadata: {}\\n"', 
-        'format', 
-        'path', 
-        'name', 
-        'content'
+    log_args = [str(argument).replace("'", '"') for argument in log_call.call]
+    log_message = log_args == [
+        '"{name} converted to HTML. Metadata: {metadata}"',
+        '"converted"',
+        "name=path.name",
+        "metadata=content.data",
     ]
-    assert write_message, "Are you writing the correct message to the console?"
+    assert log_message, "Are you logging the correct message at the debug level?"
 
 
 @pytest.mark.test_parser_restructuredtext_class_module4
@@ -295,7 +293,12 @@ def test_parser_restructuredtext_parse_module4(parse):
 def test_parser_restructuredtext_parse_write_html_module4(parse):
     # html = publish_parts(content.body, writer_name="html5")
     # self.write(path, dest, html["html_body"])
-    # sys.stdout.write("\x1b[1;32m{} converted to HTML. Metadata: {}\n".format(path.name, content))
+    # log.debug(
+    #     "{name} converted to HTML. Metadata: {metadata}",
+    #     "converted",
+    #     name=path.name,
+    #     metadata=content.data,
+    # )
 
     parsers = parse("parsers")
     assert parsers.success, parsers.message
@@ -338,26 +341,20 @@ def test_parser_restructuredtext_parse_write_html_module4(parse):
         write_args_correct
     ), "Are you passing the correct arguments to `self.write()`?"
 
-    stdout_write_call = parse.code.find(
+    log_call = parse.code.find(
         "atomtrailers",
-        lambda node: len(node) == 4
-        and node[0].name.value == "sys"
-        and node[1].name.value == "stdout"
-        and node[2].name.value == "write",
+        lambda node: len(node) == 3
+        and node[0].name.value == "log"
+        and node[1].name.value == "debug",
     )
-    stdout_write_args = list(
-        stdout_write_call.call_argument.find_all(["name", "string", "binary_operator"]).map(
-            lambda node: str(node.value).replace("'", '"')
-        )
-    )
-    write_message = stdout_write_args == [
-        '"\\x1b[1;32m{} converted to HTML. Metadata: {}\\n"', 
-        'format', 
-        'path', 
-        'name', 
-        'content'
+    log_args = [str(argument).replace("'", '"') for argument in log_call.call]
+    log_message = log_args == [
+        '"{name} converted to HTML. Metadata: {metadata}"',
+        '"converted"',
+        "name=path.name",
+        "metadata=content.data",
     ]
-    assert write_message, "Are you writing the correct message to the console?"
+    assert log_message, "Are you logging the correct message at the debug level?"
 
 @pytest.mark.test_ssg_parsers_array_module4
 def test_ssg_parsers_array_module4(parse):
@@ -386,17 +383,17 @@ def test_ssg_parsers_array_module4(parse):
 
 @pytest.mark.test_site_staticmethod_module4
 def test_site_staticmethod_module4(parse):
-    # import sys
+    # from ssg import log
 
     # @staticmethod
     # def error(message):
-    #     sys.stderr.write("\x1b[1;31m{}\n".format(message))
+    #     log.error(message)
 
     site = parse("site")
     assert site.success, site.message
 
-    sys_import = "sys" in site.get_imports()
-    assert sys_import, "Are you importing `sys`?"
+    log_import = "log" in site.get_from_import("ssg")
+    assert log_import, "Are you importing `log` from `ssg`?"
 
     site_class = site.get_by_name("class", "Site")
 
@@ -417,20 +414,14 @@ def test_site_staticmethod_module4(parse):
     message_arg = site.get_by_value("def_argument", "message", error.code)
     assert message_arg.exists, "Does the `error` method have a `message` argument?"
 
-    stderr_write_call = error.code.find(
+    log_call = error.code.find(
         "atomtrailers",
-        lambda node: len(node) == 4
-        and node[0].name.value == "sys"
-        and node[1].name.value == "stderr"
-        and node[2].name.value == "write",
+        lambda node: len(node) == 3
+        and node[0].name.value == "log"
+        and node[1].name.value == "error",
     )
-    write_args = list(
-        stderr_write_call.call_argument.find_all(["name", "string", "binary_operator"]).map(
-            lambda node: str(node.value).replace("'", '"')
-        )
-    )
-    error_message = write_args == ['"\\x1b[1;31m{}\\n"', 'format', 'message']
-    assert error_message, "Are you passing in the correct error message?"
+    error_message = log_call is not None and str(log_call.call) == "(message)"
+    assert error_message, "Are you passing the message to `log.error()`?"
 
 
 @pytest.mark.test_site_error_call_module4
@@ -0,0 +1,143 @@
+import os
+
+import pytest
+
+import ssg.output
+
+from pathlib import Path
+
+from ssg.site import Site, BuildError
+from ssg.output import DiskOutput, StagingArea
+from ssg.parsers import LudayHtmlParser
+from tests.luday import make_spec, make_template
+
+
+def test_unchanged_bytes_are_not_rewritten(tmp_path):
+    output = DiskOutput()
+    page = tmp_path / "page.html"
+    output.write(page, "<p>one</p>")
+    before = os.stat(page)
+
+    output.write(page, "<p>one</p>")
+    with output.open(page) as file:
+        file.write("<p>")
+        file.write("one</p>")
+    assert os.stat(page).st_ino == before.st_ino
+    assert os.stat(page).st_mtime_ns == before.st_mtime_ns
+    assert (output.written, output.unchanged) == (1, 2)
+
+    output.write(page, "<p>two</p>")
+    assert page.read_text() == "<p>two</p>"
+    assert output.written == 2
+    assert [path.name for path in tmp_path.iterdir()] == ["page.html"]
+
+
+def test_writes_never_go_through_hardlinks(tmp_path):
+    live = tmp_path / "live.html"
+    live.write_text("<p>live</p>")
+    staged = tmp_path / "staged.html"
+    os.link(live, staged)
+
+    DiskOutput().write(staged, "<p>staged</p>")
+    assert live.read_text() == "<p>live</p>"
+    assert staged.read_text() == "<p>staged</p>"
+
+
+def make_site(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    make_template(tmp_path)
+    (tmp_path / "content").mkdir()
+    make_spec(tmp_path / "content" / "home.json", "home", "intro_1")
+    return Site("content", "dist", [LudayHtmlParser()], incremental=True, atomic=True)
+
+
+class WatchingParser(LudayHtmlParser):
+    def parse(self, path, source, dest):
+        self.seen = (dest, Path("dist").exists())
+        super().parse(path, source, dest)
+
+
+def test_atomic_build_swaps_in_a_staged_tree(tmp_path, monkeypatch):
+    site = make_site(tmp_path, monkeypatch)
+    site.build()
+    home = tmp_path / "dist" / "Demo" / "home.html"
+    assert "<p>one</p>" in home.read_text()
+    assert site.dest == Path("dist")
+    assert (tmp_path / "dist" / ".ssg-manifest.json").exists()
+
+    columns = tmp_path / "web" / "bootstrap" / "main" / "Demo" / "sections" / "columns"
+    (columns / "intro_1.html").write_text("<p>uno</p>\n")
+    parser = WatchingParser()
+    Site("content", "dist", [parser], incremental=True, atomic=True).build()
+    assert parser.seen == (Path(".dist.staging"), True)
+    assert "<p>uno</p>" in home.read_text()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["content", "dist", "web"]
+
+
+def test_failed_atomic_build_leaves_dest_untouched(tmp_path, monkeypatch):
+    make_site(tmp_path, monkeypatch).build()
+    home = tmp_path / "dist" / "Demo" / "home.html"
+    before = home.read_text()
+
+    make_spec(tmp_path / "content" / "about.json", "about", "intro_9")
+    (tmp_path / "web" / "bootstrap" / "main" / "Demo" / "about.html").write_text("")
+    make_spec(tmp_path / "content" / "home.json", "home", "intro_2")
+    site = Site("content", "dist", [LudayHtmlParser()], incremental=True, atomic=True)
+    with pytest.raises(BuildError):
+        site.build()
+
+    assert home.read_text() == before
+    assert not (tmp_path / "dist" / "Demo" / "about.html").exists()
+    assert not (tmp_path / ".dist.staging").exists()
+    assert site.dest == Path("dist")
+
+
+def test_swap_falls_back_to_two_renames(tmp_path, monkeypatch):
+    monkeypatch.setattr(ssg.output, "exchange", lambda first, second: False)
+    dest = tmp_path / "dist"
+    dest.mkdir()
+    (dest / "old.html").write_text("old")
+
+    staging = StagingArea(dest)
+    path = staging.open()
+    assert os.stat(path / "old.html").st_ino == os.stat(dest / "old.html").st_ino
+    (path / "old.html").unlink()
+    (path / "new.html").write_text("new")
+    staging.commit()
+
+    assert sorted(path.name for path in dest.iterdir()) == ["new.html"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["dist"]
+
+
+def test_copies_racing_on_a_new_directory(tmp_path, monkeypatch):
+    source = tmp_path / "site.css"
+    source.write_text("body {}")
+    first = DiskOutput()
+    second = DiskOutput()
+    transfer = DiskOutput.transfer
+
+    def interleaved(self, path, target):
+        # The second copy makes the directory while the first one is failing
+        if self is first and not Path(target).parent.exists():
+            second.copy(path, Path(target).with_name("other.css"))
+            raise FileNotFoundError(target)
+        transfer(self, path, target)
+
+    monkeypatch.setattr(DiskOutput, "transfer", interleaved)
+    first.copy(source, tmp_path / "dist" / "css" / "site.css")
+    assert (tmp_path / "dist" / "css" / "site.css").read_text() == "body {}"
+    assert (tmp_path / "dist" / "css" / "other.css").read_text() == "body {}"
+
+    with pytest.raises(FileNotFoundError):
+        first.copy(tmp_path / "missing.css", tmp_path / "dist" / "missing.css")
+
+
+def test_replace_from_many_threads(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    target = tmp_path / "page.md"
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda index: ssg.output.replace(target, "page {}".format(index)), range(64)))
+    assert target.read_text().startswith("page ")
+    assert os.listdir(tmp_path) == ["page.md"]
+    assert os.stat(target).st_mode & 0o777 == 0o666 & ~ssg.output.UMASK
@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+from ssg.site import Site, BuildError
+from ssg.parsers import Parser, ResourceParser
+
+
+class BrokenParser(Parser):
+    extensions = [".bad"]
+
+    def parse(self, path, source, dest):
+        raise ValueError("cannot parse {}".format(path.name))
+
+
+class LockedParser(ResourceParser):
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+
+
+def make_source(tmp_path, count=8):
+    source = tmp_path / "content"
+    (source / "nested").mkdir(parents=True)
+    for number in range(count):
+        (source / "nested" / "file{}.css".format(number)).write_text(str(number))
+    return source
+
+
+def test_parallel_build_matches_serial(tmp_path):
+    source = make_source(tmp_path)
+    serial = Site(source, tmp_path / "serial", [ResourceParser()])
+    serial.build()
+    parallel = Site(source, tmp_path / "parallel", [ResourceParser()], jobs=4)
+    parallel.build()
+
+    assert serial.manifest.entries.keys() == parallel.manifest.entries.keys()
+    for number in range(8):
+        name = "nested/file{}.css".format(number)
+        assert (tmp_path / "parallel" / name).read_text() == str(number)
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_build_collects_errors_per_file(tmp_path, jobs):
+    source = make_source(tmp_path, count=2)
+    (source / "one.bad").write_text("")
+    (source / "two.bad").write_text("")
+
+    site = Site(source, tmp_path / "dist", [ResourceParser(), BrokenParser()], jobs=jobs)
+    with pytest.raises(BuildError) as error:
+        site.build()
+
+    assert sorted(path.name for path, _ in error.value.errors) == ["one.bad", "two.bad"]
+    assert (tmp_path / "dist" / "nested" / "file1.css").exists()
+
+
+def test_unpicklable_parser_runs_serially(tmp_path):
+    source = make_source(tmp_path, count=2)
+    site = Site(source, tmp_path / "dist", [LockedParser()], jobs=2)
+    site.build()
+
+    assert not site.picklable(site.parsers[0])
+    assert sorted(site.manifest.entries) == ["nested/file0.css", "nested/file1.css"]
@@ -0,0 +1,76 @@
+import io
+import json
+
+from ssg import profile
+from ssg.site import Site
+from ssg.parsers import LudayHtmlParser
+from ssg.profile import Profiler
+from tests.luday import make_spec, make_template
+
+
+def make_site(tmp_path, monkeypatch, jobs=1):
+    monkeypatch.chdir(tmp_path)
+    make_template(tmp_path)
+    (tmp_path / "content").mkdir()
+    make_spec(tmp_path / "content" / "home.json", "home", "intro_1")
+    make_spec(tmp_path / "content" / "about.json", "about", "intro_2")
+    return Site("content", "dist", [LudayHtmlParser()], jobs=jobs, profiler=Profiler())
+
+
+def test_stages_are_free_without_a_profiler():
+    assert profile.current is None
+    assert profile.stage("markdown") is profile.NULL
+    with profile.stage("markdown") as span:
+        span.args["ignored"] = True
+
+
+def test_build_records_stages_and_files(tmp_path, monkeypatch):
+    site = make_site(tmp_path, monkeypatch)
+    site.build()
+    assert profile.current is None
+
+    stages = site.profiler.stages()
+    for name in ["load", "scan", "prepare", "render", "collect", "save", "copy", "fragments"]:
+        assert name in stages
+    assert stages["render"]["wall"] >= stages["copy"]["wall"]
+
+    files = {event["name"]: event for event in site.profiler.files()}
+    assert sorted(files) == ["content/about.json", "content/home.json"]
+    home = files["content/home.json"]["args"]
+    assert home["parser"] == "LudayHtmlParser"
+    assert home["output_size"] == (tmp_path / "dist" / "Demo" / "home.html").stat().st_size + len(
+        "body {}"
+    )
+    assert home["input_size"] > (tmp_path / "content" / "home.json").stat().st_size
+
+    totals = site.profiler.parsers()["LudayHtmlParser"]
+    assert totals["files"] == 2
+
+    stream = io.StringIO()
+    site.profiler.report(limit=1, stream=stream)
+    report = stream.getvalue()
+    assert "LudayHtmlParser" in report
+    assert report.count("content/") == 1
+
+
+def test_export_writes_a_chrome_trace(tmp_path, monkeypatch):
+    site = make_site(tmp_path, monkeypatch)
+    site.build()
+    site.profiler.export(tmp_path / "trace" / "build.json")
+
+    data = json.loads((tmp_path / "trace" / "build.json").read_text())
+    events = data["traceEvents"]
+    assert min(event["ts"] for event in events) == 0
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
+    assert data["parsers"]["LudayHtmlParser"]["files"] == 2
+    assert len(data["slowest"]) == 2
+
+
+def test_worker_timings_reach_the_parent(tmp_path, monkeypatch):
+    site = make_site(tmp_path, monkeypatch, jobs=2)
+    site.build()
+
+    files = site.profiler.files()
+    assert len(files) == 2
+    assert {event["pid"] for event in files} != {site.profiler.events[0]["pid"]}
+    assert "fragments" in site.profiler.stages()
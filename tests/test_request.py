@@ -0,0 +1,163 @@
+import time
+import asyncio
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ssg.content import Content
+from data.request import FetchCache, fetchAll, pagePath, readUrls
+
+PAGES = {
+    "/": "<html><head><title>Home</title></head><body><h1>Welcome</h1><p>Hello</p></body></html>",
+    "/blog/first-post.html": "<html><head><title>First &amp; best</title><script>var x;</script>"
+    "</head><body><h2>Post</h2><p>Some <b>bold</b> text</p></body></html>",
+    "/about": "<p>No title here</p>",
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, self.headers.get("If-None-Match")))
+            server.active += 1
+            server.busiest = max(server.busiest, server.active)
+        try:
+            time.sleep(server.delay)
+            if self.path == "/sitemap.xml":
+                return self.send(200, server.sitemap.encode("utf-8"), "application/xml")
+            page = PAGES.get(self.path)
+            if page is None:
+                return self.send(404, b"missing")
+            etag = '"{}"'.format(abs(hash(page)))
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send(200, page.encode("utf-8"), "text/html; charset=utf-8", etag)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def send(self, status, body, kind="text/plain", etag=None):
+        self.send_response(status)
+        self.send_header("Content-Type", kind)
+        self.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", "Tue, 01 Jan 2030 00:00:00 GMT")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(delay=0.0):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.active = server.busiest = 0
+    server.delay = delay
+    server.base = "http://127.0.0.1:{}".format(server.server_address[1])
+    server.sitemap = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        + "".join("<url><loc>{}{}</loc></url>".format(server.base, path) for path in PAGES)
+        + "</urlset>"
+    )
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    return server
+
+
+def test_pages_become_front_matter_markdown(tmp_path, capsys):
+    server = serve()
+    try:
+        urls = readUrls(server.base + "/sitemap.xml")
+        cache = FetchCache(tmp_path / "cache")
+        counts = asyncio.run(fetchAll(urls, tmp_path / "content", cache))
+    finally:
+        server.shutdown()
+
+    assert counts == {"fetched": 3, "unchanged": 0, "failed": 0}
+    post = Content.load((tmp_path / "content" / "blog" / "first-post.md").read_text())
+    assert post["title"] == "First & best"
+    assert post["source"] == server.base + "/blog/first-post.html"
+    assert post.body.strip() == "## Post\n\nSome **bold** text"
+    assert Content.load((tmp_path / "content" / "index.md").read_text())["title"] == "Home"
+    assert Content.load((tmp_path / "content" / "about.md").read_text())["title"] == "about"
+
+
+def test_unchanged_pages_use_conditional_requests(tmp_path, capsys):
+    server = serve()
+    urls = [server.base + path for path in PAGES] + [server.base + "/gone"]
+    try:
+        cache = FetchCache(tmp_path / "cache")
+        asyncio.run(fetchAll(urls, tmp_path / "content", cache))
+        cache.save()
+        post = tmp_path / "content" / "blog" / "first-post.md"
+        before = post.stat().st_mtime_ns
+        (tmp_path / "content" / "about.md").unlink()
+
+        server.requests.clear()
+        cache = FetchCache(tmp_path / "cache")
+        cache.load()
+        counts = asyncio.run(fetchAll(urls, tmp_path / "content", cache))
+    finally:
+        server.shutdown()
+
+    assert counts == {"fetched": 1, "unchanged": 2, "failed": 1}
+    conditional = {path: etag is not None for path, etag in server.requests}
+    assert conditional == {"/": True, "/blog/first-post.html": True, "/about": False, "/gone": False}
+    assert post.stat().st_mtime_ns == before
+    assert (tmp_path / "content" / "about.md").exists()
+    assert "Failed to fetch {}/gone".format(server.base) in capsys.readouterr().err
+
+
+def test_pages_are_fetched_concurrently(tmp_path, capsys):
+    server = serve(delay=0.2)
+    urls = [server.base + "/"] * 2 + [server.base + path for path in PAGES] + [server.base + "/x"]
+    try:
+        asyncio.run(fetchAll(urls, tmp_path / "content", concurrency=4))
+    finally:
+        server.shutdown()
+    assert len(server.requests) == 4
+    assert server.busiest > 1
+
+
+def test_urls_from_a_list_file(tmp_path):
+    listing = tmp_path / "urls.txt"
+    listing.write_text("# legacy site\nhttp://example.com/a\n\n  http://example.com/b/  \n")
+    assert readUrls(str(listing)) == ["http://example.com/a", "http://example.com/b/"]
+    assert pagePath("http://example.com/b/", "content").as_posix() == "content/b.md"
+    assert pagePath("http://example.com/x/y.html", "content").as_posix() == "content/x/y.md"
+    assert pagePath("http://example.com/x/y.html?q=1", "content").as_posix() == "content/x/y-7de36096.md"
+    assert pagePath("http://example.com/../../etc", "content").as_posix() == "content/etc.md"
+
+
+def test_urls_saved_to_the_same_file_are_fetched_once(tmp_path, capsys):
+    server = serve(delay=0.1)
+    urls = [server.base + path for path in ["/about", "/about/", "/about.html", "/about?x=1"]]
+    try:
+        counts = asyncio.run(fetchAll(urls, tmp_path / "content", concurrency=4))
+    finally:
+        server.shutdown()
+    assert sorted(path for path, etag in server.requests) == ["/about", "/about?x=1"]
+    assert counts == {"fetched": 1, "unchanged": 0, "failed": 1}
+    assert sorted(path.name for path in (tmp_path / "content").iterdir()) == ["about.md"]
+    assert "Skipped {}/about.html, {}/about is saved to".format(server.base, server.base) in capsys.readouterr().out
+
+
+def test_pages_that_cannot_be_saved_fail_alone(tmp_path, capsys):
+    server = serve()
+    (tmp_path / "content").mkdir()
+    # A directory where the file should go
+    (tmp_path / "content" / "about.md").mkdir()
+    try:
+        cache = FetchCache(tmp_path / "cache")
+        counts = asyncio.run(fetchAll([server.base + "/", server.base + "/about"], tmp_path / "content", cache))
+    finally:
+        server.shutdown()
+    assert counts == {"fetched": 1, "unchanged": 0, "failed": 1}
+    assert list(cache.entries) == [server.base + "/"]
+    assert "Failed to save {}/about".format(server.base) in capsys.readouterr().err
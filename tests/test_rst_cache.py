@@ -0,0 +1,39 @@
+from docutils.core import publish_parts
+
+from ssg.site import Site
+from ssg.parsers import ReStructuredTextParser
+
+PAGE = "+++\ntitle: Contact\n+++\nContact\n=======\n\nWrite to *us*.\n"
+
+
+def build(tmp_path, parser):
+    source = tmp_path / "content"
+    source.mkdir(exist_ok=True)
+    (source / "contact.rst").write_text(PAGE)
+    Site(source, tmp_path / "dist", [parser], cache_dir=tmp_path / "cache").build()
+    return parser
+
+
+def test_shared_publisher_matches_publish_parts():
+    parser = ReStructuredTextParser()
+    for body in ["Title\n=====\n\ntext\n", "- one\n- two\n", ".. note:: hi\n"]:
+        assert parser.publish_parts(body) == publish_parts(body, writer_name="html5")
+    assert list(parser.publishers) == ["html5"]
+
+
+def test_rendered_parts_are_cached(tmp_path, capsys):
+    parser = build(tmp_path, ReStructuredTextParser())
+    assert parser.render_cache.misses == 1
+    expected = publish_parts(PAGE.split("+++", 2)[2], writer_name="html5")
+    assert (tmp_path / "dist" / "contact.html").read_text() == expected["html_body"]
+
+    parser = build(tmp_path, ReStructuredTextParser())
+    assert (parser.render_cache.hits, parser.render_cache.misses) == (1, 0)
+    assert parser.publishers == {}
+
+
+def test_settings_are_part_of_the_key(tmp_path, capsys):
+    build(tmp_path, ReStructuredTextParser())
+    parser = build(tmp_path, ReStructuredTextParser({"doctitle_xform": False}))
+    assert parser.render_cache.misses == 1
+    assert "<h2>Contact</h2>" in (tmp_path / "dist" / "contact.html").read_text()
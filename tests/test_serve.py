@@ -0,0 +1,132 @@
+import asyncio
+import json
+
+from pathlib import Path
+
+from ssg.site import Site
+from ssg.serve import DevServer
+from ssg.output import MemoryOutput
+from tests.luday import CountingParser, make_spec, make_template
+
+
+def make_server(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    main = make_template(tmp_path)
+    (tmp_path / "content").mkdir()
+    make_spec(tmp_path / "content" / "about.json", "about", "intro_2")
+    make_spec(tmp_path / "content" / "home.json", "home", "intro_1")
+    parser = CountingParser()
+    return DevServer(Site("content", "dist", [parser]), port=0), parser, main
+
+
+async def fetch(port, url):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write("GET {} HTTP/1.1\r\nHost: localhost\r\n\r\n".format(url).encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), head.decode("latin-1"), body
+
+
+def test_memory_output_reads_copies_lazily(tmp_path):
+    asset = tmp_path / "site.css"
+    asset.write_text("body {}")
+    output = MemoryOutput()
+    output.copy(asset, Path("dist") / "site.css")
+    with output.open(Path("dist") / "index.html") as file:
+        file.write("<p>hi</p>")
+
+    asset.write_text("main {}")
+    assert output.read(Path("dist") / "site.css") == b"main {}"
+    assert output.read("dist/index.html") == b"<p>hi</p>"
+    assert output.read("dist/missing.html") is None
+
+
+def test_pages_render_on_demand_into_memory(tmp_path, monkeypatch):
+    server, parser, _ = make_server(tmp_path, monkeypatch)
+
+    async def scenario():
+        listener = await server.start()
+        async with listener:
+            page = await fetch(server.port, "/Demo/about.html")
+            css = await fetch(server.port, "/Demo/css/site.css")
+            missing = await fetch(server.port, "/Demo/nope.html")
+        return page, css, missing
+
+    page, css, missing = asyncio.run(scenario())
+    assert page[0] == 200
+    assert "text/html" in page[1]
+    assert b"<p>two</p>" in page[2]
+    assert page[2].count(b"EventSource") == 1
+    assert css[0] == 200 and css[2] == b"body {}"
+    assert missing[0] == 404
+
+    # Only the source behind the first page was needed to serve it, and the
+    # miss had to render everything else before giving up
+    assert [name for name, _ in parser.parsed] == ["about.json", "home.json"]
+    assert not (tmp_path / "dist").exists()
+
+
+def test_misses_render_only_what_a_parser_could_produce(tmp_path, monkeypatch):
+    server, parser, _ = make_server(tmp_path, monkeypatch)
+
+    async def scenario():
+        listener = await server.start()
+        async with listener:
+            icon = await fetch(server.port, "/favicon.ico")
+            rendered = list(parser.parsed)
+            first = await fetch(server.port, "/Demo/nope.html")
+            second = await fetch(server.port, "/Demo/nope.html")
+            after_misses = list(parser.parsed)
+            server.invalidate({"content/new.json"})
+            third = await fetch(server.port, "/Demo/nope.html")
+        return icon, rendered, first, second, after_misses, third
+
+    icon, rendered, first, second, after_misses, third = asyncio.run(scenario())
+    assert icon[0] == first[0] == second[0] == third[0] == 404
+    # Nothing renders an .ico, so the site is not walked for it
+    assert rendered == []
+    # The miss is remembered, and a change on disk makes it worth another look
+    assert [name for name, _ in after_misses] == ["about.json", "home.json"]
+    assert "/Demo/nope.html" in server.missing
+
+
+def test_sources_named_like_the_page_render_first(tmp_path, monkeypatch):
+    server, parser, _ = make_server(tmp_path, monkeypatch)
+
+    async def scenario():
+        listener = await server.start()
+        async with listener:
+            return await fetch(server.port, "/Demo/home.html")
+
+    assert asyncio.run(scenario())[0] == 200
+    assert [name for name, _ in parser.parsed] == ["home.json"]
+
+
+def test_changed_dependencies_push_a_reload(tmp_path, monkeypatch):
+    server, parser, main = make_server(tmp_path, monkeypatch)
+    fragment = main / "sections" / "columns" / "intro_2.html"
+
+    async def scenario():
+        listener = await server.start()
+        async with listener:
+            await fetch(server.port, "/Demo/about.html")
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(b"GET /__ssg/events HTTP/1.1\r\n\r\n")
+            await writer.drain()
+            await reader.readuntil(b"\r\n\r\n")
+            while not server.clients:
+                await asyncio.sleep(0.01)
+
+            fragment.write_text("<p>deux</p>\n")
+            server.invalidate({fragment.relative_to(tmp_path)})
+            event = await asyncio.wait_for(reader.readuntil(b"\n\n"), 2)
+            writer.close()
+            page = await fetch(server.port, "/Demo/about.html")
+        return event, page
+
+    event, page = asyncio.run(scenario())
+    assert json.loads(event[len(b"data: ") :]) == ["/Demo/about.html", "/Demo/css/site.css"]
+    assert b"<p>deux</p>" in page[2]
+    assert [name for name, _ in parser.parsed] == ["about.json", "about.json"]
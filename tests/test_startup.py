@@ -0,0 +1,35 @@
+import io
+import subprocess
+import sys
+
+from ssg.startup import ImportTimer
+
+
+def test_import_timer_records_new_modules(tmp_path, monkeypatch):
+    (tmp_path / "slow_module.py").write_text("import time\ntime.sleep(0.01)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    timer = ImportTimer().install()
+    try:
+        import slow_module  # noqa: F401
+    finally:
+        timer.uninstall()
+        sys.modules.pop("slow_module", None)
+
+    cumulative, own = timer.timings["slow_module"]
+    assert cumulative >= 0.01
+    assert own <= cumulative
+
+    stream = io.StringIO()
+    timer.report(stream=stream)
+    assert "slow_module" in stream.getvalue()
+
+
+def test_parsers_import_heavy_libraries_lazily():
+    code = (
+        "import sys, ssg.site, ssg.parsers;"
+        "print(sorted(m for m in ('markdown', 'docutils', 'yaml') if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == "[]"
@@ -0,0 +1,84 @@
+import json
+
+from ssg.site import Site
+from ssg.parsers import LAYOUTS, LudayHtmlParser
+from tests.luday import CountingParser, make_spec, make_template
+
+
+def write(root, name, text):
+    path = root / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+def test_luday_pages_use_the_layouts_in_web(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    make_template(tmp_path)
+    (tmp_path / "content").mkdir()
+    make_spec(tmp_path / "content" / "home.json", "home", "intro_1")
+    Site("content", "dist", [LudayHtmlParser()], cache_dir=".ssg-cache").build()
+    home = tmp_path / "dist" / "Demo" / "home.html"
+    assert home.read_text().startswith("<!DOCTYPE html>")
+    assert '<link rel="stylesheet" href="css/site.css">\n</head>' in home.read_text()
+    assert "bootstrap-icons" in home.read_text()
+    # Compiled layouts are kept in the cache directory
+    assert list((tmp_path / ".ssg-cache" / "templates").iterdir())
+
+    write(tmp_path, "web/bootstrap/layouts/Demo.html",
+          '{% extends "bootstrap.html" %}{% block title %}{{ page.name }}{% endblock %}')
+    Site("content", "dist", [LudayHtmlParser()], cache_dir=".ssg-cache").build()
+    assert "<title>home</title>" in home.read_text()
+    assert "bootstrap-icons" in home.read_text()
+
+
+def test_luday_pages_for_other_frameworks(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    main = write(tmp_path, "web/plain/main/Demo/home.html", "").parent
+    write(main, "sections/columns/intro_1.html", "<p>one</p>\n")
+    write(tmp_path, "web/plain/layouts/page.html",
+          "<main>{% for fragment in fragments %}{% include \"item.html\" %}{% endfor %}</main>")
+    # Included templates see the loop variable
+    write(tmp_path, "web/plain/layouts/item.html", "<div>{{ fragment }}</div>")
+    spec = {
+        "type": "website",
+        "template": "Demo",
+        "pages": [
+            {
+                "name": "home",
+                "framework": "plain",
+                "sections": [{"div": {"file_name": "intro_1", "type": "body"}}],
+            }
+        ],
+    }
+    write(tmp_path, "content/home.json", json.dumps(spec))
+    Site("content", "dist", [LudayHtmlParser()]).build()
+    assert (tmp_path / "dist" / "Demo" / "home.html").read_text() == "<main><div><p>one</p>\n</div></main>"
+
+
+def test_layouts_are_dependencies_of_their_pages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    make_template(tmp_path)
+    (tmp_path / "content").mkdir()
+    make_spec(tmp_path / "content" / "home.json", "home", "intro_1")
+    footer = write(tmp_path, "web/bootstrap/layouts/footer.html", "<footer></footer>")
+    write(tmp_path, "web/bootstrap/layouts/Demo.html",
+          '{% extends "bootstrap.html" %}{% block body %}{% include "footer.html" %}{% endblock %}')
+
+    site = Site("content", "dist", [CountingParser()], incremental=True)
+    site.build()
+    dependencies = site.manifest.entries["home.json"]["dependencies"]
+    for name in ["web/bootstrap/layouts/Demo.html", "web/bootstrap/layouts/footer.html"]:
+        assert name in dependencies
+    for name in ["bootstrap.html", "page.html"]:
+        assert (LAYOUTS / name).as_posix() in dependencies
+
+    parser = CountingParser()
+    Site("content", "dist", [parser], incremental=True).build()
+    assert parser.parsed == []
+
+    footer.write_text("<footer>new</footer>")
+    parser = CountingParser()
+    Site("content", "dist", [parser], incremental=True).build()
+    assert [name for name, _ in parser.parsed] == ["home.json"]
+    assert "<footer>new</footer>" in (tmp_path / "dist" / "Demo" / "home.html").read_text()
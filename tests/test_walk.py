@@ -0,0 +1,105 @@
+import os
+
+from pathlib import Path
+
+from ssg.site import Site
+from ssg.walk import Walker
+from ssg.parsers import LudayHtmlParser
+from tests.luday import make_spec, make_template
+
+
+def make_tree(root):
+    for name in [
+        "a/one.md",
+        "a/b/two.md",
+        "a/b/c/three.md",
+        "d/four.md",
+        "five.md",
+        ".git/HEAD",
+        "node_modules/lib/index.js",
+        "d/.four.md.swp",
+        "drafts/six.md",
+    ]:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(name)
+
+
+def relative(paths, root):
+    return sorted(Path(path).relative_to(root).as_posix() for path in paths)
+
+
+def test_walk_skips_ignored_patterns(tmp_path):
+    make_tree(tmp_path)
+    assert relative(Walker().walk(tmp_path), tmp_path) == [
+        "a/b/c/three.md",
+        "a/b/two.md",
+        "a/one.md",
+        "d/four.md",
+        "drafts/six.md",
+        "five.md",
+    ]
+
+    walker = Walker(["drafts/*", "a/b"])
+    assert relative(walker.walk(tmp_path), tmp_path) == [
+        ".git/HEAD",
+        "a/one.md",
+        "d/.four.md.swp",
+        "d/four.md",
+        "five.md",
+        "node_modules/lib/index.js",
+    ]
+
+
+def test_walk_reuses_dirent_types(tmp_path, monkeypatch):
+    make_tree(tmp_path)
+    walker = Walker(directories=True)
+    paths = list(walker.walk(tmp_path))
+
+    def stat(*args, **kwargs):
+        raise AssertionError("stat called")
+
+    monkeypatch.setattr(os, "stat", stat)
+    kinds = {path.relative_to(tmp_path).as_posix(): path.is_dir() for path in paths}
+    assert all(path.is_dir() or path.is_file() for path in paths)
+    assert kinds["a/b"] and kinds["drafts"]
+    assert not kinds["five.md"]
+
+
+def test_parallel_walk_matches_serial(tmp_path):
+    make_tree(tmp_path)
+    serial = relative(Walker(directories=True).walk(tmp_path), tmp_path)
+    parallel = relative(Walker(threads=4, directories=True).walk(tmp_path), tmp_path)
+    assert parallel == serial
+    assert "a/b/c" in serial
+
+
+def test_symlink_loops_are_walked_once(tmp_path):
+    make_tree(tmp_path)
+    os.symlink(tmp_path / "a", tmp_path / "a" / "b" / "loop")
+    paths = relative(Walker().walk(tmp_path / "a"), tmp_path / "a")
+    assert paths == ["b/c/three.md", "b/two.md", "one.md"]
+
+
+def make_site(tmp_path, monkeypatch, **options):
+    monkeypatch.chdir(tmp_path)
+    make_template(tmp_path)
+    (tmp_path / "content" / "pages" / "empty").mkdir(parents=True)
+    (tmp_path / "content" / ".git").mkdir()
+    (tmp_path / "content" / ".git" / "page.json").write_text("{")
+    make_spec(tmp_path / "content" / "pages" / "home.json", "home", "intro_1")
+    return Site("content", "dist", [LudayHtmlParser()], **options)
+
+
+def test_build_creates_only_written_directories(tmp_path, monkeypatch):
+    make_site(tmp_path, monkeypatch).build()
+    assert (tmp_path / "dist" / "Demo" / "home.html").exists()
+    assert not (tmp_path / "dist" / "pages").exists()
+    assert not (tmp_path / "dist" / ".git").exists()
+
+
+def test_build_can_mirror_source_directories(tmp_path, monkeypatch):
+    make_site(tmp_path, monkeypatch, mirror_dirs=True, scan_threads=2).build()
+    assert (tmp_path / "dist" / "Demo" / "home.html").exists()
+    assert (tmp_path / "dist" / "pages" / "empty").is_dir()
+    assert not (tmp_path / "dist" / ".git").exists()
@@ -0,0 +1,114 @@
+import sys
+
+from pathlib import Path
+
+import pytest
+
+from ssg.site import Site
+from ssg.watch import InotifyBackend, PollingBackend, Watcher
+from tests.luday import CountingParser, make_spec, make_template
+
+
+def make_site(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    main = make_template(tmp_path)
+    (tmp_path / "content").mkdir()
+    make_spec(tmp_path / "content" / "home.json", "home", "intro_1")
+    make_spec(tmp_path / "content" / "about.json", "about", "intro_2")
+    parser = CountingParser()
+    site = Site("content", "dist", [parser], incremental=True)
+    site.build()
+    parser.parsed.clear()
+    return site, parser, main
+
+
+def test_rebuild_only_touches_dependents_of_a_fragment(tmp_path, monkeypatch):
+    site, parser, main = make_site(tmp_path, monkeypatch)
+    fragment = main / "sections" / "columns" / "intro_2.html"
+    fragment.write_text("<p>deux</p>\n")
+
+    rebuilt = site.rebuild([fragment.relative_to(tmp_path)])
+    assert rebuilt == [Path("content") / "about.json"]
+    assert parser.parsed == [("about.json", {Path("dist") / "Demo" / "about.html"})]
+    assert "deux" in (tmp_path / "dist" / "Demo" / "about.html").read_text()
+
+
+def test_rebuild_removes_outputs_of_deleted_sources(tmp_path, monkeypatch):
+    site, parser, _ = make_site(tmp_path, monkeypatch)
+    (tmp_path / "content" / "about.json").unlink()
+
+    assert site.rebuild([Path("content") / "about.json"]) == []
+    assert not (tmp_path / "dist" / "Demo" / "about.html").exists()
+    assert (tmp_path / "dist" / "Demo" / "home.html").exists()
+    assert "about.json" not in site.manifest.entries
+
+
+def test_rebuild_retries_sources_that_failed(tmp_path, monkeypatch):
+    site, parser, main = make_site(tmp_path, monkeypatch)
+    (main / "blog.html").write_text("")
+    make_spec(tmp_path / "content" / "blog.json", "blog", "intro_3")
+    site.rebuild([Path("content") / "blog.json"])
+    assert [path.name for path, _ in site.errors] == ["blog.json"]
+
+    (main / "sections" / "columns" / "intro_3.html").write_text("<p>three</p>\n")
+    site.rebuild([Path("web")])
+    assert site.errors == []
+    assert (tmp_path / "dist" / "Demo" / "blog.html").exists()
+
+
+def test_polling_backend_reports_changes(tmp_path):
+    (tmp_path / "page.md").write_text("one")
+    backend = PollingBackend([tmp_path], interval=0.01)
+    assert backend.wait(0.02) == set()
+
+    (tmp_path / "page.md").write_text("three")
+    (tmp_path / "new.md").write_text("new")
+    assert backend.wait(1) == {tmp_path / "page.md", tmp_path / "new.md"}
+
+    (tmp_path / "new.md").unlink()
+    assert backend.wait(1) == {tmp_path / "new.md"}
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_inotify_backend_sees_files_in_new_directories(tmp_path):
+    backend = InotifyBackend([tmp_path])
+    try:
+        (tmp_path / "posts").mkdir()
+        (tmp_path / "posts" / "first.md").write_text("first")
+        changed = backend.wait(1)
+        while True:
+            more = backend.wait(0.05)
+            if not more:
+                break
+            changed |= more
+        assert {tmp_path / "posts", tmp_path / "posts" / "first.md"} <= changed
+
+        (tmp_path / "posts" / "second.md").write_text("second")
+        assert tmp_path / "posts" / "second.md" in backend.wait(1)
+    finally:
+        backend.close()
+
+
+def test_watcher_debounces_and_rebuilds(tmp_path, monkeypatch):
+    site, parser, main = make_site(tmp_path, monkeypatch)
+    watcher = Watcher(site, ["web"], debounce=0.05)
+    try:
+        fragment = main / "sections" / "columns" / "intro_1.html"
+        fragment.write_text("<p>uno</p>\n")
+        fragment.write_text("<p>eins</p>\n")
+        rebuilt = watcher.poll(timeout=2)
+    finally:
+        watcher.backend.close()
+
+    assert rebuilt == [Path("content") / "home.json"]
+    assert len(parser.parsed) == 1
+    assert "eins" in (tmp_path / "dist" / "Demo" / "home.html").read_text()
+
+
+def test_watcher_ignores_output_inside_watched_roots(tmp_path, monkeypatch):
+    site, _, _ = make_site(tmp_path, monkeypatch)
+    site.dest = Path("content") / "_site"
+    watcher = Watcher(site, backend=PollingBackend([]))
+    assert watcher.ignored(Path("content") / "_site" / "index.html")
+    assert watcher.ignored(Path("content") / ".#home.json")
+    assert not watcher.ignored(Path("content") / "home.json")